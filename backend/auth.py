@@ -1,23 +1,42 @@
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from database import get_db, User
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from config import (
+    SECRET_KEY,
+    ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    AUTH_CACHE_SIZE,
+    AUTH_CACHE_TTL,
+    AUTH_TRUST_TOKEN_CLAIMS
+)
+from cache import TTLCache
+from passwords import verify_password, get_password_hash
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by request handlers, detached from any session."""
+    id: int
+    email: str
+    username: str
+    created_at: Optional[datetime] = None
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+# Verified token -> user id, and user id -> Principal, so a user's cached
+# principal can be dropped by id no matter how many tokens point at it.
+# Both are per process: other workers keep serving a stale principal until
+# their own entry expires, at most AUTH_CACHE_TTL seconds later.
+token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+principal_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+auth_stats = {"claim_hits": 0, "db_lookups": 0, "invalidations": 0}
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -31,25 +50,94 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def create_user_token(user: User) -> str:
+    """Create an access token carrying signed principal claims for the user."""
+    return create_access_token(data={
+        "sub": str(user.id),
+        "username": user.username,
+        "email": user.email,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    })
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget the cached principal for a user after their record changes.
+
+    Only clears this worker's cache; see the note on ``principal_cache``.
+    """
+    if principal_cache.delete(user_id):
+        auth_stats["invalidations"] += 1
+
+
+def get_auth_cache_stats() -> dict:
+    return {**token_cache.stats(), "principals": principal_cache.stats(), **auth_stats}
+
+
+def _principal_from_claims(payload: dict) -> Optional[Principal]:
+    if not payload.get("username") or not payload.get("email"):
+        return None
+    created_at = payload.get("created_at")
+    return Principal(
+        id=int(payload["sub"]),
+        email=payload["email"],
+        username=payload["username"],
+        created_at=datetime.fromisoformat(created_at) if created_at else None,
+    )
+
+
+def _resolve_principal(token: str, db: Session) -> Optional[Principal]:
+    """Decode a token into a Principal, using the cache where possible.
+
+    Raises JWTError if the token is invalid or expired.
+    """
+    cached_id = token_cache.get(token)
+    principal = principal_cache.get(cached_id) if cached_id is not None else None
+    if principal is not None:
+        return principal
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    user_id = payload.get("sub")
+    if user_id is None:
+        return None
+
+    principal = _principal_from_claims(payload) if AUTH_TRUST_TOKEN_CLAIMS else None
+    if principal is not None:
+        auth_stats["claim_hits"] += 1
+    else:
+        auth_stats["db_lookups"] += 1
+        user = db.query(User).filter(User.id == int(user_id)).first()
+        if user is None:
+            return None
+        principal = Principal(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            created_at=user.created_at,
+        )
+
+    # Never cache past the token's own expiry
+    ttl = AUTH_CACHE_TTL
+    if payload.get("exp"):
+        ttl = min(ttl, payload["exp"] - time.time())
+    token_cache.set(token, principal.id, ttl=ttl)
+    principal_cache.set(principal.id, principal)
+    return principal
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        user = _resolve_principal(credentials.credentials, db)
+    except (JWTError, ValueError):
         raise credentials_exception
-    
-    user = db.query(User).filter(User.id == user_id).first()
+
     if user is None:
         raise credentials_exception
     return user
@@ -58,16 +146,10 @@ def get_current_user(
 def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[Principal]:
     if credentials is None:
         return None
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            return None
-        user = db.query(User).filter(User.id == user_id).first()
-        return user
-    except JWTError:
+        return _resolve_principal(credentials.credentials, db)
+    except (JWTError, ValueError):
         return None
@@ -0,0 +1,36 @@
+from typing import Optional
+from config import CACHE_BACKEND_URL, CACHE_MEMORY_MAX_ENTRIES
+from backends.base import Backend, LockTimeout
+from backends.memory import MemoryBackend
+
+_backend: Optional[Backend] = None
+
+
+def create_backend(url: str) -> Backend:
+    """Build a backend from a URL: memory://, sqlite:///path.db or redis://..."""
+    if url.startswith("memory://"):
+        return MemoryBackend(maxsize=CACHE_MEMORY_MAX_ENTRIES)
+    if url.startswith("sqlite:///"):
+        from backends.sqlite import SQLiteBackend
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        from backends.redis_backend import RedisBackend
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
+
+
+def get_backend() -> Backend:
+    """Return the process-wide backend configured by CACHE_BACKEND_URL."""
+    global _backend
+    if _backend is None:
+        _backend = create_backend(CACHE_BACKEND_URL)
+    return _backend
+
+
+def set_backend(backend: Backend) -> None:
+    """Swap the process-wide backend (e.g. for a fakeredis-backed RedisBackend)."""
+    global _backend
+    _backend = backend
+
+
+__all__ = ['Backend', 'LockTimeout', 'MemoryBackend', 'create_backend', 'get_backend', 'set_backend']
@@ -0,0 +1,158 @@
+import abc
+import time
+import uuid
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Optional
+
+
+class LockTimeout(Exception):
+    """Raised when a lock could not be acquired in time."""
+
+
+class Backend(abc.ABC):
+    """Cache and coordination primitives shared between workers.
+
+    Values and job payloads must be JSON-serializable. Implementations
+    provide the primitive methods; locking helpers and single-flight are
+    built on top of them here. The a* methods run the primitives off the
+    event loop for backends that do network or disk I/O.
+    """
+
+    # Primitive calls block on I/O; MemoryBackend sets this to False
+    blocking = True
+
+    # -- cache --
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    # -- locks --
+
+    @abc.abstractmethod
+    def acquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        """Try once to take a lock; returns an owner token or None."""
+        ...
+
+    @abc.abstractmethod
+    def release_lock(self, name: str, token: str) -> None:
+        """Release a lock, but only if it is still held by this token."""
+        ...
+
+    # -- job queues --
+
+    @abc.abstractmethod
+    def enqueue(self, queue: str, payload: Any) -> None:
+        ...
+
+    @abc.abstractmethod
+    def dequeue(self, queue: str, timeout: float = 0) -> Optional[Any]:
+        """Pop the oldest job, waiting up to timeout seconds for one."""
+        ...
+
+    @abc.abstractmethod
+    def queue_size(self, queue: str) -> int:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    # -- async --
+
+    async def _run(self, method: Callable[..., Any], *args) -> Any:
+        if self.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await self._run(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self._run(self.set, key, value, ttl)
+
+    async def adelete(self, key: str) -> None:
+        await self._run(self.delete, key)
+
+    async def aacquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        return await self._run(self.acquire_lock, name, ttl)
+
+    async def arelease_lock(self, name: str, token: str) -> None:
+        await self._run(self.release_lock, name, token)
+
+    async def aenqueue(self, queue: str, payload: Any) -> None:
+        await self._run(self.enqueue, queue, payload)
+
+    async def adequeue(self, queue: str, timeout: float = 0) -> Optional[Any]:
+        if timeout:
+            # Waiting for a job blocks in every backend, including MemoryBackend
+            return await asyncio.to_thread(self.dequeue, queue, timeout)
+        return await self._run(self.dequeue, queue, timeout)
+
+    # -- helpers --
+
+    @staticmethod
+    def new_token() -> str:
+        return uuid.uuid4().hex
+
+    @contextmanager
+    def lock(self, name: str, ttl: float = 30, timeout: float = 10, poll: float = 0.05):
+        """Block until the named lock is held, then release it on exit."""
+        deadline = time.monotonic() + timeout
+        token = self.acquire_lock(name, ttl)
+        while token is None:
+            if time.monotonic() >= deadline:
+                raise LockTimeout(name)
+            time.sleep(poll)
+            token = self.acquire_lock(name, ttl)
+        try:
+            yield
+        finally:
+            self.release_lock(name, token)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                             ttl: Optional[float] = None, lock_ttl: float = 120,
+                             poll: float = 0.2, max_wait: Optional[float] = None) -> Any:
+        """Single-flight: only one worker cluster-wide computes a missing key.
+
+        Others wait for the value to appear (or the lock to be released) and
+        only compute themselves if the holder gave up without a result, or
+        after max_wait seconds (e.g. the caller's remaining deadline).
+        Results of None are not cached.
+        """
+        value = await self.aget(key)
+        if value is not None:
+            return value
+
+        lock_name = f"lock:{key}"
+        token = await self.aacquire_lock(lock_name, lock_ttl)
+        waited = 0.0
+        wait_limit = lock_ttl if max_wait is None else min(lock_ttl, max_wait)
+        while token is None and waited < wait_limit:
+            await asyncio.sleep(poll)
+            waited += poll
+            value = await self.aget(key)
+            if value is not None:
+                return value
+            token = await self.aacquire_lock(lock_name, lock_ttl)
+
+        try:
+            # The previous holder may have finished just before we took over
+            value = await self.aget(key) if token else None
+            if value is not None:
+                return value
+            value = await compute()
+            if value is not None:
+                await self.aset(key, value, ttl)
+            return value
+        finally:
+            if token:
+                await self.arelease_lock(lock_name, token)
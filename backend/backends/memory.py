@@ -0,0 +1,81 @@
+import time
+import threading
+from collections import defaultdict, deque
+from typing import Any, Dict, Optional, Tuple
+from backends.base import Backend
+
+
+class MemoryBackend(Backend):
+    """Process-local backend; state is not shared between workers.
+
+    Cache entries are bounded by maxsize, evicting the oldest first.
+    """
+
+    # Only dequeue with a timeout waits; adequeue runs that case in a thread
+    blocking = False
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._queues: Dict[str, deque] = defaultdict(deque)
+        self._mutex = threading.Lock()
+        self._queue_ready = threading.Condition(self._mutex)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._mutex:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._mutex:
+            self._data.pop(key, None)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.maxsize:
+                del self._data[next(iter(self._data))]
+
+    def delete(self, key: str) -> None:
+        with self._mutex:
+            self._data.pop(key, None)
+
+    def acquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        now = time.monotonic()
+        with self._mutex:
+            held = self._locks.get(name)
+            if held and held[1] > now:
+                return None
+            token = self.new_token()
+            self._locks[name] = (token, now + ttl)
+            return token
+
+    def release_lock(self, name: str, token: str) -> None:
+        with self._mutex:
+            held = self._locks.get(name)
+            if held and held[0] == token:
+                del self._locks[name]
+
+    def enqueue(self, queue: str, payload: Any) -> None:
+        with self._queue_ready:
+            self._queues[queue].append(payload)
+            self._queue_ready.notify()
+
+    def dequeue(self, queue: str, timeout: float = 0) -> Optional[Any]:
+        deadline = time.monotonic() + timeout
+        with self._queue_ready:
+            while not self._queues[queue]:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._queue_ready.wait(remaining)
+            return self._queues[queue].popleft()
+
+    def queue_size(self, queue: str) -> int:
+        with self._mutex:
+            return len(self._queues[queue])
@@ -0,0 +1,66 @@
+import json
+from typing import Any, Optional
+from backends.base import Backend
+
+# Deletes the lock only if it still holds our token
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBackend(Backend):
+    """Cluster-wide backend on Redis (or any Redis-compatible server).
+
+    Pass `client` to use an existing connection, e.g. a fakeredis instance
+    in tests.
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "recipes:"):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        px = int(ttl * 1000) if ttl else None
+        self.client.set(self._key(key), json.dumps(value), px=px)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def acquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        token = self.new_token()
+        acquired = self.client.set(self._key(name), token, nx=True, px=int(ttl * 1000))
+        return token if acquired else None
+
+    def release_lock(self, name: str, token: str) -> None:
+        self.client.eval(RELEASE_SCRIPT, 1, self._key(name), token)
+
+    def enqueue(self, queue: str, payload: Any) -> None:
+        self.client.rpush(self._key(f"queue:{queue}"), json.dumps(payload))
+
+    def dequeue(self, queue: str, timeout: float = 0) -> Optional[Any]:
+        key = self._key(f"queue:{queue}")
+        if timeout > 0:
+            item = self.client.blpop([key], timeout=timeout)
+            raw = item[1] if item else None
+        else:
+            raw = self.client.lpop(key)
+        return json.loads(raw) if raw is not None else None
+
+    def queue_size(self, queue: str) -> int:
+        return self.client.llen(self._key(f"queue:{queue}"))
+
+    def close(self) -> None:
+        self.client.close()
@@ -0,0 +1,141 @@
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Optional
+from backends.base import Backend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS locks (
+    name TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_queue ON jobs (queue, id);
+"""
+
+
+class SQLiteBackend(Backend):
+    """Backend shared by every worker process on a single node.
+
+    Expiry uses wall-clock time since it is compared across processes.
+    Expired rows are purged from set/acquire_lock every purge_interval
+    seconds.
+    """
+
+    def __init__(self, path: str, poll: float = 0.1, purge_interval: float = 300):
+        self.path = path
+        self.poll = poll
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._maybe_purge()
+        expires_at = time.time() + ttl if ttl else None
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at),
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        conn.execute("DELETE FROM locks WHERE expires_at <= ?", (now,))
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            self.purge_expired()
+
+    def acquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        self._maybe_purge()
+        token = self.new_token()
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM locks WHERE name = ? AND expires_at <= ?", (name, now))
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO locks (name, token, expires_at) VALUES (?, ?, ?)",
+                (name, token, now + ttl),
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return token if inserted else None
+
+    def release_lock(self, name: str, token: str) -> None:
+        self._conn().execute("DELETE FROM locks WHERE name = ? AND token = ?", (name, token))
+
+    def enqueue(self, queue: str, payload: Any) -> None:
+        self._conn().execute(
+            "INSERT INTO jobs (queue, payload) VALUES (?, ?)", (queue, json.dumps(payload))
+        )
+
+    def _pop(self, queue: str) -> Optional[Any]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, payload FROM jobs WHERE queue = ? ORDER BY id LIMIT 1", (queue,)
+            ).fetchone()
+            if row:
+                conn.execute("DELETE FROM jobs WHERE id = ?", (row[0],))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return json.loads(row[1]) if row else None
+
+    def dequeue(self, queue: str, timeout: float = 0) -> Optional[Any]:
+        deadline = time.monotonic() + timeout
+        while True:
+            payload = self._pop(queue)
+            if payload is not None or time.monotonic() >= deadline:
+                return payload
+            time.sleep(self.poll)
+
+    def queue_size(self, queue: str) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM jobs WHERE queue = ?", (queue,)).fetchone()[0]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
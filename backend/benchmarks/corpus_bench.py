@@ -0,0 +1,175 @@
+"""Offline website-extraction benchmark over the saved HTML corpus.
+
+For every extraction strategy this measures pages/second, mean per-page parse
+time, peak per-page memory and field-level accuracy against the expected
+output stored next to each page in benchmarks/corpus.
+
+The corpus is small and synthetic: treat the numbers as a regression signal
+against a baseline from the same machine, not as real-world throughput.
+
+Usage (from the backend folder):
+    python -m benchmarks.corpus_bench --save-baseline corpus_baseline.json
+    python -m benchmarks.corpus_bench --baseline corpus_baseline.json
+
+Exits with status 1 when throughput or accuracy regresses beyond the
+thresholds relative to the baseline.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Dict, Any, Optional, List, Callable
+
+from extractors.website_extractor import decode_html, extract_from_html, extract_with_scrapers, extract_json_ld
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+FIELDS = ["title", "ingredients", "instructions", "image_url"]
+
+
+def _scrapers_only(html: str, url: str) -> Optional[Dict[str, Any]]:
+    try:
+        return extract_with_scrapers(html, url)
+    except Exception:
+        return None
+
+
+STRATEGIES: Dict[str, Callable[[str, str], Optional[Dict[str, Any]]]] = {
+    "pipeline": extract_from_html,
+    "scrapers": _scrapers_only,
+    "json_ld": extract_json_ld,
+}
+
+
+def load_corpus() -> Dict[str, Any]:
+    with open(os.path.join(CORPUS_DIR, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    for page in manifest["pages"]:
+        # Decoded the way fetched pages are; "encoding": null means no charset was sent
+        with open(os.path.join(CORPUS_DIR, f"{page['name']}.html"), "rb") as f:
+            page["html"] = decode_html(f.read(), page.get("encoding", "utf-8"))
+        with open(os.path.join(CORPUS_DIR, f"{page['name']}.expected.json")) as f:
+            page["expected"] = json.load(f)
+    return manifest
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def score(result: Optional[Dict[str, Any]], expected: Optional[Dict[str, Any]]) -> float:
+    """Fraction of expected fields reproduced; no-recipe pages must yield nothing."""
+    if expected is None:
+        return 1.0 if not result or not result.get("ingredients") else 0.0
+    if not result:
+        return 0.0
+    matched = sum(1 for field in FIELDS if _normalize(result.get(field)) == _normalize(expected.get(field)))
+    return matched / len(FIELDS)
+
+
+def bench_strategy(func, pages: List[Dict[str, Any]], iterations: int) -> Dict[str, Any]:
+    per_page = {}
+    total_time = 0.0
+
+    for page in pages:
+        # Timing pass
+        start = time.perf_counter()
+        for _ in range(iterations):
+            result = func(page["html"], page["url"])
+        elapsed = time.perf_counter() - start
+        total_time += elapsed
+
+        # Memory pass, kept separate so tracing doesn't skew timings
+        tracemalloc.start()
+        func(page["html"], page["url"])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        per_page[page["name"]] = {
+            "kind": page["kind"],
+            "mean_ms": round(elapsed / iterations * 1000, 3),
+            "peak_kb": round(peak / 1024, 1),
+            "accuracy": round(score(result, page["expected"]), 3),
+        }
+
+    accuracies = [p["accuracy"] for p in per_page.values()]
+    return {
+        "pages_per_second": round(len(pages) * iterations / total_time, 2) if total_time else 0.0,
+        "accuracy": round(sum(accuracies) / len(accuracies), 3),
+        "pages": per_page,
+    }
+
+
+def run(iterations: int, strategies: List[str]) -> Dict[str, Any]:
+    corpus = load_corpus()
+    results = {}
+    # Extractors log failures with print(); keep the report on stdout clean
+    with redirect_stdout(io.StringIO()):
+        for name in strategies:
+            results[name] = bench_strategy(STRATEGIES[name], corpus["pages"], iterations)
+
+    return {
+        "corpus_version": corpus["version"],
+        "iterations": iterations,
+        "strategies": results,
+    }
+
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any],
+                     max_slowdown: float, max_accuracy_drop: float) -> List[str]:
+    problems = []
+    if baseline.get("corpus_version") != report["corpus_version"]:
+        return [f"Baseline is for corpus v{baseline.get('corpus_version')}, "
+                f"current corpus is v{report['corpus_version']}; refresh the baseline"]
+
+    for name, current in report["strategies"].items():
+        previous = baseline["strategies"].get(name)
+        if not previous:
+            continue
+        floor = previous["pages_per_second"] * (1 - max_slowdown)
+        if current["pages_per_second"] < floor:
+            problems.append(f"{name}: throughput {current['pages_per_second']} pages/s "
+                            f"< {floor:.2f} (baseline {previous['pages_per_second']})")
+        if current["accuracy"] < previous["accuracy"] - max_accuracy_drop - 1e-9:
+            problems.append(f"{name}: accuracy {current['accuracy']} "
+                            f"dropped from {previous['accuracy']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline HTML corpus extraction benchmark")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--strategies", type=lambda v: v.split(","), default=list(STRATEGIES))
+    parser.add_argument("--baseline", help="Compare against this report and fail on regressions")
+    parser.add_argument("--save-baseline", help="Write the report here for future comparisons")
+    parser.add_argument("--max-slowdown", type=float, default=0.2, help="Allowed throughput drop (fraction)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.0, help="Allowed accuracy drop (fraction)")
+    args = parser.parse_args()
+
+    report = run(args.iterations, args.strategies)
+    print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = find_regressions(report, baseline, args.max_slowdown, args.max_accuracy_drop)
+        for problem in problems:
+            print(f"REGRESSION: {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""End-to-end load benchmark against local upstream stand-ins.
+
+Boots the API in a subprocess wired to the stubs in benchmarks.stubs, drives a
+weighted mix of extract/list/save/login requests at each concurrency level and
+prints (or writes) a JSON report with throughput and p50/p95/p99 per endpoint.
+
+Usage (from the backend folder):
+    python -m benchmarks.load --concurrency 1,8,32 --duration 20 --output bench.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Tuple, Any
+
+import httpx
+
+from benchmarks.stubs import serve, RecipeSiteHandler, VideoInfoHandler, OpenAIHandler
+
+DEFAULT_MIX = "extract_website=4,extract_video=1,list=3,save=2,login=1"
+PAGE_COUNT = 500
+PASSWORD = "bench-password"
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown operations: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Session:
+    """Per-worker client state: a benchmark user and their token."""
+
+    def __init__(self, client: httpx.AsyncClient, user: Dict[str, str], site_url: str):
+        self.client = client
+        self.user = user
+        self.site_url = site_url
+        self.rng = random.Random(user["email"])
+
+    @property
+    def auth(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.user['token']}"}
+
+
+async def op_extract_website(s: Session) -> httpx.Response:
+    url = f"{s.site_url}/recipes/{s.rng.randrange(PAGE_COUNT)}"
+    return await s.client.post("/api/extract", json={"url": url})
+
+
+async def op_extract_video(s: Session) -> httpx.Response:
+    video_id = f"bench{s.rng.randrange(1000):06d}"
+    return await s.client.post("/api/extract", json={"url": f"https://www.youtube.com/watch?v={video_id}"})
+
+
+async def op_list(s: Session) -> httpx.Response:
+    return await s.client.get("/api/recipes", headers=s.auth)
+
+
+async def op_save(s: Session) -> httpx.Response:
+    return await s.client.post("/api/recipes/save", headers=s.auth, json={
+        "title": "Benchmark Cookies",
+        "source_url": f"{s.site_url}/recipes/{s.rng.randrange(PAGE_COUNT)}",
+        "ingredients": ["2 cups flour", "1 cup butter", "2 eggs"],
+        "instructions": ["Mix.", "Bake."],
+        "servings": "24",
+    })
+
+
+async def op_login(s: Session) -> httpx.Response:
+    return await s.client.post("/api/auth/login", json={
+        "email": s.user["email"], "password": PASSWORD,
+    })
+
+
+OPERATIONS = {
+    "extract_website": op_extract_website,
+    "extract_video": op_extract_video,
+    "list": op_list,
+    "save": op_save,
+    "login": op_login,
+}
+
+
+async def register_users(client: httpx.AsyncClient, count: int) -> List[Dict[str, str]]:
+    users = []
+    for i in range(count):
+        user = {"email": f"bench{i}@example.com", "username": f"bench{i}"}
+        response = await client.post("/api/auth/register", json={**user, "password": PASSWORD})
+        response.raise_for_status()
+        user["token"] = response.json()["access_token"]
+        users.append(user)
+    return users
+
+
+async def run_level(base_url: str, site_url: str, users: List[Dict[str, str]],
+                    mix: Dict[str, int], concurrency: int, duration: float) -> Dict[str, Any]:
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    samples: List[Tuple[str, float, bool]] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(index: int):
+            session = Session(client, users[index % len(users)], site_url)
+            while time.perf_counter() < deadline:
+                name = session.rng.choices(names, weights)[0]
+                start = time.perf_counter()
+                try:
+                    response = await OPERATIONS[name](session)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                samples.append((name, (time.perf_counter() - start) * 1000, ok))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in names:
+        latencies = sorted(ms for n, ms, _ in samples if n == name)
+        errors = sum(1 for n, _, ok in samples if n == name and not ok)
+        endpoints[name] = {
+            "count": len(latencies),
+            "errors": errors,
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+        }
+
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": len(samples),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "endpoints": endpoints,
+    }
+
+
+def wait_for_health(base_url: str, proc: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"API process exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API did not become healthy in time")
+
+
+async def run(args) -> Dict[str, Any]:
+    _, site_url = serve(RecipeSiteHandler, latency=args.site_latency)
+    _, video_url = serve(VideoInfoHandler, latency=args.site_latency)
+    _, openai_url = serve(OpenAIHandler, latency=args.llm_latency)
+
+    workdir = tempfile.mkdtemp(prefix="recipe-bench-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "BENCH_YTDLP_INFO_URL": video_url,
+    }
+    if not args.cache:
+        env["EXTRACT_CACHE_TTL"] = "0"
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.serve", "--port", str(args.port)],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    try:
+        wait_for_health(base_url, proc)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            users = await register_users(client, args.users)
+
+        levels = []
+        for concurrency in args.concurrency:
+            print(f"Running concurrency={concurrency} for {args.duration}s...", file=sys.stderr)
+            levels.append(await run_level(base_url, site_url, users, args.mix,
+                                          concurrency, args.duration))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    return {
+        "config": {
+            "mix": args.mix,
+            "duration_s": args.duration,
+            "users": args.users,
+            "llm_latency_s": args.llm_latency,
+            "site_latency_s": args.site_latency,
+            "extract_cache": args.cache,
+        },
+        "levels": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark against local upstream stubs")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per concurrency level")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fake OpenAI latency in seconds")
+    parser.add_argument("--site-latency", type=float, default=0.05, help="Fake site/video latency in seconds")
+    parser.add_argument("--cache", action="store_true", help="Keep the extract result cache enabled")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Run the sitemap prewarmer against the local stub recipe site.
+
+Three cycles: a cold crawl that extracts every page, a repeat that should
+find nothing changed, and one after bumping some pages' lastmod that
+should only re-extract those. Prints each cycle's stats as JSON.
+
+Usage (from the backend folder):
+    python -m benchmarks.prewarm_bench --pages 50 --changed 5
+"""
+import json
+import asyncio
+import argparse
+
+from benchmarks.stubs import serve, RecipeSiteHandler
+from backends.memory import MemoryBackend
+from extractors import shutdown_parse_pool
+from prewarm import Prewarmer
+
+
+async def run(pages: int, changed: int, host_interval: float):
+    revisions = {}
+    server, base_url = serve(RecipeSiteHandler, page_count=pages, revisions=revisions, story_paragraphs=10)
+    backend = MemoryBackend(maxsize=pages * 4)
+    prewarmer = Prewarmer(
+        [f"{base_url}/sitemap.xml", f"{base_url}/feed.xml"],
+        backend=backend,
+        host_interval=host_interval,
+        max_urls=pages,
+    )
+
+    report = {"cold": await prewarmer.run_once(), "repeat": await prewarmer.run_once()}
+    for index in range(changed):
+        revisions[index] = revisions.get(index, 0) + 1
+    report["changed"] = await prewarmer.run_once()
+
+    server.shutdown()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prewarmer run against the local stub site")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--changed", type=int, default=5)
+    parser.add_argument("--host-interval", type=float, default=0.01)
+    args = parser.parse_args()
+    try:
+        print(json.dumps(asyncio.run(run(args.pages, args.changed, args.host_interval)), indent=2))
+    finally:
+        shutdown_parse_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Run the API with yt-dlp pointed at the local video info stub.
+
+Usage (from the backend folder):
+    BENCH_YTDLP_INFO_URL=http://127.0.0.1:9001 python -m benchmarks.serve --port 8100
+"""
+import os
+import argparse
+
+import uvicorn
+import yt_dlp
+
+from benchmarks.stubs import StubYoutubeDL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API against local stubs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    if os.environ.get("BENCH_YTDLP_INFO_URL"):
+        yt_dlp.YoutubeDL = StubYoutubeDL
+
+    from main import app
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Local stand-ins for every upstream the backend talks to.
+
+- a static recipe site serving realistic blog-style recipe pages, with a
+  sitemap index, sitemap and RSS feed for the prewarmer
+- a yt-dlp info/caption source, plus a YoutubeDL replacement that reads it
+- an OpenAI-compatible chat completion and transcription server
+
+All servers are plain ThreadingHTTPServers on ephemeral ports so they can
+be started from the benchmark runner, a test, or a shell.
+"""
+import os
+import re
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+
+LOREM = (
+    "This recipe has been in our family for years and every time we make it the "
+    "kitchen fills with the most wonderful smell. Before we get to the recipe card, "
+    "here are a few notes on ingredients, substitutions and equipment. "
+)
+
+
+def recipe_data(index: int) -> Dict[str, Any]:
+    return {
+        "@type": "Recipe",
+        "name": f"Benchmark Recipe {index}",
+        "image": [f"/images/{index}.jpg"],
+        "recipeIngredient": [
+            "2 cups all-purpose flour",
+            "1 tsp baking soda",
+            "1/2 tsp salt",
+            "1 cup unsalted butter, softened",
+            "3/4 cup granulated sugar",
+            "2 large eggs",
+            "2 cups chocolate chips",
+            f"{index % 5 + 1} tbsp milk",
+        ],
+        "recipeInstructions": [
+            {"@type": "HowToStep", "text": "Preheat the oven to 375F."},
+            {"@type": "HowToStep", "text": "Whisk flour, baking soda and salt."},
+            {"@type": "HowToStep", "text": "Cream butter and sugar, then beat in eggs."},
+            {"@type": "HowToStep", "text": "Combine, fold in chips and bake 10 minutes."},
+        ],
+        "prepTime": "PT15M",
+        "cookTime": "PT10M",
+        "totalTime": "PT25M",
+        "recipeYield": "24 cookies",
+    }
+
+
+def recipe_page(index: int, story_paragraphs: int = 40) -> bytes:
+    """Render a blog-style recipe page with a JSON-LD @graph block."""
+    graph = {
+        "@context": "https://schema.org",
+        "@graph": [
+            {"@type": "WebSite", "name": "Bench Kitchen"},
+            {"@type": "BreadcrumbList", "itemListElement": []},
+            recipe_data(index),
+        ],
+    }
+    nav = "".join(f'<li><a href="/category/{i}">Category {i}</a></li>' for i in range(30))
+    story = "".join(f"<p>{LOREM * 4}</p>" for _ in range(story_paragraphs))
+    html = (
+        "<!DOCTYPE html><html><head>"
+        f"<title>Benchmark Recipe {index}</title>"
+        f'<script type="application/ld+json">{json.dumps(graph)}</script>'
+        "</head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<article><h1>Benchmark Recipe {index}</h1>{story}</article>"
+        "<footer>Bench Kitchen</footer></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def video_info(base_url: str, video_id: str) -> Dict[str, Any]:
+    """A yt-dlp-shaped info dict with English json3 captions."""
+    return {
+        "id": video_id,
+        "title": f"Easy Weeknight Pasta ({video_id})",
+        "description": "Ingredients: 200g spaghetti, 2 cloves garlic, 3 tbsp olive oil, "
+                       "chili flakes, parsley, parmesan. Full method in the video!",
+        "thumbnail": f"{base_url}/thumbs/{video_id}.jpg",
+        "duration": 312,
+        "extractor": "youtube",
+        "subtitles": {
+            "en": [{"ext": "json3", "url": f"{base_url}/captions/{video_id}"}],
+        },
+        "automatic_captions": {},
+    }
+
+
+def captions_json3() -> Dict[str, Any]:
+    lines = [
+        "today we're making a super easy garlic pasta",
+        "bring a big pot of salted water to a boil and cook 200 grams of spaghetti",
+        "meanwhile slice two cloves of garlic and warm three tablespoons of olive oil",
+        "add the garlic and a pinch of chili flakes and cook until golden",
+        "toss in the pasta with a splash of pasta water, parsley and parmesan",
+    ] * 20
+    return {"events": [{"segs": [{"utf8": line}]} for line in lines]}
+
+
+def chat_completion_body() -> Dict[str, Any]:
+    recipe = {
+        "title": "Easy Garlic Pasta",
+        "ingredients": ["200g spaghetti", "2 cloves garlic", "3 tbsp olive oil",
+                        "1 pinch chili flakes", "parsley", "parmesan"],
+        "instructions": ["Boil the spaghetti.", "Fry garlic and chili in oil.",
+                         "Toss with pasta, parsley and parmesan."],
+        "prep_time": "5 minutes",
+        "cook_time": "10 minutes",
+        "servings": "2",
+        "tips": ["Save some pasta water."],
+    }
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-4o-mini",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": json.dumps(recipe)},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 900, "completion_tokens": 200, "total_tokens": 1100},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data: Any, status: int = 200) -> None:
+        self._send(status, json.dumps(data).encode("utf-8"), "application/json")
+
+    def _drain(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+
+# Revised pages are dated from server start, after every unrevised page
+REVISED_SINCE = int(time.time())
+
+
+def page_timestamp(index: int, revision: int = 0) -> int:
+    """A stable per-page modification time; any revision makes it the newest."""
+    if revision:
+        return REVISED_SINCE + revision * 60 + index
+    return 1704067200 + index * 3600
+
+
+def page_lastmod(index: int, revision: int = 0) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(page_timestamp(index, revision)))
+
+
+def sitemap_index_xml(base_url: str, page_count: int, revisions: Dict[int, int]) -> bytes:
+    newest = max(range(max(1, page_count)), key=lambda i: page_timestamp(i, revisions.get(i, 0)))
+    lastmod = page_lastmod(newest, revisions.get(newest, 0))
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f"<sitemap><loc>{base_url}/sitemap-recipes.xml</loc><lastmod>{lastmod}</lastmod></sitemap>"
+        "</sitemapindex>"
+    ).encode("utf-8")
+
+
+def sitemap_xml(base_url: str, page_count: int, revisions: Dict[int, int]) -> bytes:
+    urls = "".join(
+        f"<url><loc>{base_url}/recipes/{i}</loc><lastmod>{page_lastmod(i, revisions.get(i, 0))}</lastmod></url>"
+        for i in range(page_count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+    ).encode("utf-8")
+
+
+def rss_xml(base_url: str, page_count: int, revisions: Dict[int, int], latest: int = 10) -> bytes:
+    items = "".join(
+        f"<item><title>Benchmark Recipe {i}</title><link>{base_url}/recipes/{i}</link>"
+        f"<pubDate>{time.strftime('%a, %d %b %Y %H:%M:%S +0000', time.gmtime(page_timestamp(i, revisions.get(i, 0))))}</pubDate></item>"
+        for i in range(max(0, page_count - latest), page_count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<rss version=\"2.0\"><channel><title>Bench Kitchen</title>{items}</channel></rss>"
+    ).encode("utf-8")
+
+
+class RecipeSiteHandler(_Handler):
+    story_paragraphs = 40
+    base_url = ""
+    page_count = 50
+    revisions: Dict[int, int] = {}  # page index -> revision, for lastmod changes
+    robots_txt = "User-agent: *\nDisallow: /private/\n"
+
+    def do_GET(self):
+        if self.path == "/robots.txt":
+            self._send(200, self.robots_txt.encode("utf-8"), "text/plain")
+            return
+        if self.path == "/sitemap.xml":
+            self._send(200, sitemap_index_xml(self.base_url, self.page_count, self.revisions), "application/xml")
+            return
+        if self.path == "/sitemap-recipes.xml":
+            self._send(200, sitemap_xml(self.base_url, self.page_count, self.revisions), "application/xml")
+            return
+        if self.path == "/feed.xml":
+            self._send(200, rss_xml(self.base_url, self.page_count, self.revisions), "application/rss+xml")
+            return
+        match = re.match(r"^/recipes/(\d+)", self.path)
+        if not match:
+            self._send(404, b"not found", "text/plain")
+            return
+        self._send(200, recipe_page(int(match.group(1)), self.story_paragraphs), "text/html; charset=utf-8")
+
+
+class VideoInfoHandler(_Handler):
+    base_url = ""
+
+    def do_GET(self):
+        if self.path.startswith("/info/"):
+            self._send_json(video_info(self.base_url, self.path.rsplit("/", 1)[-1]))
+        elif self.path.startswith("/captions/"):
+            self._send_json(captions_json3())
+        else:
+            self._send(404, b"not found", "text/plain")
+
+
+class OpenAIHandler(_Handler):
+    def do_POST(self):
+        self._drain()
+        if self.path.endswith("/chat/completions"):
+            self._send_json(chat_completion_body())
+        elif self.path.endswith("/audio/transcriptions"):
+            self._send(200, b"bring water to a boil and cook the pasta", "text/plain")
+        else:
+            self._send_json({"error": {"message": "not found"}}, status=404)
+
+
+def serve(handler_cls, **attrs) -> Tuple[ThreadingHTTPServer, str]:
+    """Start a handler class on an ephemeral port in a daemon thread."""
+    handler = type(handler_cls.__name__, (handler_cls,), dict(attrs))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    if hasattr(handler, "base_url"):
+        handler.base_url = base_url
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base_url
+
+
+class StubYoutubeDL:
+    """Drop-in for yt_dlp.YoutubeDL that reads info dicts from VideoInfoHandler."""
+
+    def __init__(self, opts: Optional[Dict[str, Any]] = None):
+        self.opts = opts or {}
+        self.info_url = os.environ["BENCH_YTDLP_INFO_URL"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url: str, download: bool = False) -> Dict[str, Any]:
+        match = re.search(r"(?:v=|youtu\.be/|shorts/)([a-zA-Z0-9_-]{11})", url)
+        video_id = match.group(1) if match else "benchvideo0"
+        response = requests.get(f"{self.info_url}/info/{video_id}", timeout=10)
+        response.raise_for_status()
+        return response.json()
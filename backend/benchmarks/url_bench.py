@@ -0,0 +1,108 @@
+"""Benchmark URL routing: legacy regex scanning vs. the canonicalize() dispatch table.
+
+Usage (from the backend folder):
+    python -m benchmarks.url_bench --count 200000
+"""
+import re
+import json
+import time
+import random
+import argparse
+from typing import List, Optional
+
+from extractors.urls import canonicalize
+
+URL_TEMPLATES = [
+    "https://www.youtube.com/watch?v={yt}&feature=share",
+    "https://m.youtube.com/watch?v={yt}&t=42s",
+    "https://youtu.be/{yt}?si=AbCdEf{n}",
+    "https://www.youtube.com/shorts/{yt}",
+    "https://www.tiktok.com/@cook{n}/video/72{n:017d}?is_from_webapp=1",
+    "https://www.instagram.com/reel/C{n:09d}/?igsh=abc",
+    "https://vimeo.com/{n}",
+    "https://www.allrecipes.com/recipe/{n}/banana-bread/?utm_source=pinterest&utm_medium=social",
+    "https://example-blog.com/{n}/chocolate-chip-cookies/amp/",
+    "https://www.seriouseats.com/best-pasta-{n}?print=1#comments",
+    "https://cooking.nytimes.com/recipes/{n}-weeknight-curry",
+]
+
+
+def legacy_extract_youtube_id(url: str) -> Optional[str]:
+    patterns = [
+        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
+        r'youtube\.com\/shorts\/([a-zA-Z0-9_-]{11})',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def legacy_is_video_url(url: str) -> bool:
+    video_patterns = [
+        r'youtube\.com',
+        r'youtu\.be',
+        r'tiktok\.com',
+        r'instagram\.com/reel',
+        r'instagram\.com/p/',
+        r'vimeo\.com',
+    ]
+    for pattern in video_patterns:
+        if re.search(pattern, url, re.IGNORECASE):
+            return True
+    return False
+
+
+def make_urls(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-"
+    # A limited id space so the same content appears under many URL variants
+    ids = ["".join(rng.choice(alphabet) for _ in range(11)) for _ in range(max(1, count // 20))]
+    urls = []
+    for _ in range(count):
+        n = rng.randrange(max(1, count // 20))
+        urls.append(rng.choice(URL_TEMPLATES).format(yt=ids[n], n=n))
+    return urls
+
+
+def bench(urls: List[str], repeat: int):
+    legacy_best = new_best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url in urls:
+            if legacy_is_video_url(url):
+                legacy_extract_youtube_id(url)
+        legacy_best = min(legacy_best, time.perf_counter() - start)
+
+        canonicalize.cache_clear()
+        start = time.perf_counter()
+        for url in urls:
+            canonicalize(url)
+        new_best = min(new_best, time.perf_counter() - start)
+
+    canonical = [canonicalize(url) for url in urls]
+    disagreements = sum(
+        1 for url, c in zip(urls, canonical) if legacy_is_video_url(url) != (c.platform is not None)
+    )
+    return {
+        "urls": len(urls),
+        "legacy_us_per_url": round(legacy_best / len(urls) * 1e6, 3),
+        "canonicalize_us_per_url": round(new_best / len(urls) * 1e6, 3),
+        "speedup": round(legacy_best / new_best, 2),
+        "distinct_raw_urls": len(set(urls)),
+        "distinct_canonical_keys": len({c.key for c in canonical}),
+        "routing_disagreements": disagreements,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="URL routing/canonicalization benchmark")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(bench(make_urls(args.count), args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
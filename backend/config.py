@@ -7,3 +7,76 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 SECRET_KEY = os.getenv("SECRET_KEY", "recipe-extractor-secret-key-2024")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./recipes.db")
+
+# Saved-recipe library import/export
+LIBRARY_BATCH_SIZE = int(os.getenv("LIBRARY_BATCH_SIZE", "500"))
+LIBRARY_MAX_LINE_BYTES = int(os.getenv("LIBRARY_MAX_LINE_BYTES", str(1024 * 1024)))  # longer import lines fail
+LIBRARY_MAX_UPLOAD_BYTES = int(os.getenv("LIBRARY_MAX_UPLOAD_BYTES", str(256 * 1024 * 1024)))  # after decompression
+
+# Password hashing
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", str(os.cpu_count() or 1)))
+HASH_QUEUE_DEPTH = int(os.getenv("HASH_QUEUE_DEPTH", "64"))
+
+# Authenticated principal cache
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", "300"))  # seconds
+# Trust the signed id/username/email claims in the token and skip the DB lookup
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+
+# HTTP responses
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+EXTRACT_CACHE_TTL = int(os.getenv("EXTRACT_CACHE_TTL", "3600"))  # seconds
+
+# Observability
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+
+# Admin endpoints and request profiling
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # empty disables admin endpoints
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # 0.0 - 1.0
+PROFILE_SLOW_THRESHOLD_MS = int(os.getenv("PROFILE_SLOW_THRESHOLD_MS", "0"))  # 0 disables
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))  # seconds between samples
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "50"))
+
+# Startup
+# Import yt-dlp, recipe-scrapers, openai and bs4 at startup instead of on first use
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "false").lower() == "true"
+
+# HTML parsing process pool (0 parses in a thread instead)
+PARSE_POOL_SIZE = int(os.getenv("PARSE_POOL_SIZE", str(os.cpu_count() or 1)))
+PARSE_POOL_MAX_TASKS = int(os.getenv("PARSE_POOL_MAX_TASKS", "200"))  # recycle workers after N pages (Python 3.11+)
+PARSE_TIMEOUT = float(os.getenv("PARSE_TIMEOUT", "10"))  # seconds per page
+
+# Shared cache / coordination backend: memory://, sqlite:///path/to/file.db or redis://host:6379/0
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL", "memory://")
+CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000"))
+VIDEO_CACHE_TTL = int(os.getenv("VIDEO_CACHE_TTL", "86400"))  # yt-dlp info, captions, transcripts
+
+# Image proxy and thumbnail cache
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "./image_cache")
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+IMAGE_MAX_ORIGIN_BYTES = int(os.getenv("IMAGE_MAX_ORIGIN_BYTES", str(15 * 1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(50_000_000)))  # refuse to decode larger images
+IMAGE_PROXY_ALLOW_PRIVATE = os.getenv("IMAGE_PROXY_ALLOW_PRIVATE", "false").lower() == "true"
+
+# Extraction deadline (overridable per request with the X-Request-Deadline header, in seconds).
+# Unset by default: any budget below the transcription estimate degrades long caption-less
+# videos to a description-only result
+EXTRACT_DEADLINE = float(os.getenv("EXTRACT_DEADLINE", "0"))  # 0 disables
+EXTRACT_DEADLINE_MAX = float(os.getenv("EXTRACT_DEADLINE_MAX", "300"))
+# Rough stage costs used to decide whether a stage can finish in the remaining budget
+LLM_ESTIMATE = float(os.getenv("LLM_ESTIMATE", "8"))  # seconds
+TRANSCRIBE_ESTIMATE_BASE = float(os.getenv("TRANSCRIBE_ESTIMATE_BASE", "10"))  # seconds
+TRANSCRIBE_ESTIMATE_PER_MINUTE = float(os.getenv("TRANSCRIBE_ESTIMATE_PER_MINUTE", "6"))  # seconds per minute of video
+
+# Sitemap/RSS prewarming of the extraction cache
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "false").lower() == "true"  # run inside the API process
+PREWARM_FEEDS = [f.strip() for f in os.getenv("PREWARM_FEEDS", "").split(",") if f.strip()]  # sitemap/RSS URLs
+PREWARM_URL_PATTERN = os.getenv("PREWARM_URL_PATTERN", "")  # regex; only matching page URLs are extracted
+PREWARM_WINDOW = os.getenv("PREWARM_WINDOW", "")  # off-peak local time, e.g. "01:00-06:00"; empty = any time
+PREWARM_INTERVAL = int(os.getenv("PREWARM_INTERVAL", "3600"))  # seconds between crawl cycles
+PREWARM_HOST_INTERVAL = float(os.getenv("PREWARM_HOST_INTERVAL", "5"))  # seconds between requests to one host
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "4"))  # hosts crawled in parallel
+PREWARM_MAX_URLS = int(os.getenv("PREWARM_MAX_URLS", "500"))  # extractions per cycle
+PREWARM_RESULT_TTL = int(os.getenv("PREWARM_RESULT_TTL", "86400"))  # seconds
@@ -1,12 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+from config import DATABASE_URL
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./recipes.db"
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -41,6 +43,37 @@ class SavedRecipe(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
 
     owner = relationship("User", back_populates="recipes")
+    # SQLite does not enforce ON DELETE CASCADE, so the ORM deletes these rows itself
+    ingredient_index = relationship("RecipeIngredient", cascade="all, delete-orphan")
+
+
+class RecipeIngredient(Base):
+    __tablename__ = "recipe_ingredients"
+
+    # One parsed ingredient line; written once when the recipe is saved
+    id = Column(Integer, primary_key=True)
+    recipe_id = Column(Integer, ForeignKey("saved_recipes.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    position = Column(Integer, nullable=False)
+    raw = Column(Text)
+    quantity = Column(Float, nullable=True)
+    unit = Column(String, nullable=True)
+    item = Column(String, nullable=False)
+    preparation = Column(String, nullable=True)
+    base_quantity = Column(Float, nullable=True)  # quantity in base_unit (ml, g or a count unit)
+    base_unit = Column(String, nullable=False, default="")
+
+    __table_args__ = (
+        Index("ix_recipe_ingredients_user_item", "user_id", "item", "base_unit"),
+    )
+
+
+class LibraryVersion(Base):
+    __tablename__ = "library_versions"
+
+    # Bumped on every change to a user's saved recipes; drives HTTP ETags
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
 
 
 def get_db():
@@ -0,0 +1,76 @@
+import time
+from typing import Optional
+
+from metrics import record_skipped
+from config import (
+    EXTRACT_DEADLINE,
+    EXTRACT_DEADLINE_MAX,
+    TRANSCRIBE_ESTIMATE_BASE,
+    TRANSCRIBE_ESTIMATE_PER_MINUTE
+)
+
+DEADLINE_HEADER = "x-request-deadline"
+
+
+class DeadlineExceeded(Exception):
+    """Raised to abort a stage once the request deadline has passed."""
+
+
+class Deadline:
+    """A monotonic time budget threaded through the extraction pipeline.
+
+    Stages ask whether they can finish in what is left and are skipped
+    (recorded in ``skipped``) when they cannot, so the caller can return a
+    partial, degraded result instead of timing out.
+    """
+
+    def __init__(self, seconds: Optional[float]):
+        self.expires_at = time.monotonic() + seconds if seconds else None
+        self.skipped = []
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, estimate: float, reserve: float = 0) -> bool:
+        """Whether a stage of ~estimate seconds fits, leaving reserve for later stages."""
+        return self.remaining() >= estimate + reserve
+
+    def timeout(self, cap: float) -> float:
+        """A network timeout bounded by the remaining budget."""
+        return max(0.1, min(cap, self.remaining()))
+
+    def ran_out(self, error: BaseException) -> bool:
+        """Whether a failed stage was cut short by the budget rather than a real error."""
+        # openai.APITimeoutError and httpx/requests timeouts are not TimeoutError subclasses
+        return self.expired or isinstance(error, TimeoutError) or "Timeout" in type(error).__name__
+
+    def skip(self, stage_name: str) -> None:
+        self.skipped.append(stage_name)
+        record_skipped(stage_name)
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded()
+
+
+def request_deadline(header_value: Optional[str]) -> Deadline:
+    """Build a deadline from the request header, falling back to config."""
+    seconds = EXTRACT_DEADLINE
+    try:
+        requested = float(header_value) if header_value else 0
+    except ValueError:
+        requested = 0
+    if requested > 0:
+        seconds = min(requested, EXTRACT_DEADLINE_MAX)
+    return Deadline(seconds if seconds > 0 else None)
+
+
+def transcription_estimate(duration: Optional[float]) -> float:
+    """Expected download + Whisper time for a video of the given length in seconds."""
+    return TRANSCRIBE_ESTIMATE_BASE + (duration or 0) / 60 * TRANSCRIBE_ESTIMATE_PER_MINUTE
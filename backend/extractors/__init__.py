@@ -1,4 +1,25 @@
 from .website_extractor import extract_from_website
 from .video_extractor import extract_from_video, is_video_url
+from .openai_client import get_openai_client
+from .urls import canonicalize, CanonicalURL
+from .parse_pool import extract_from_website_async, shutdown_parse_pool
+from lazy import load_all
 
-__all__ = ['extract_from_website', 'extract_from_video', 'is_video_url']
+
+def warm_up():
+    """Import the lazily-loaded heavy dependencies and build the OpenAI client now."""
+    status = load_all()
+    get_openai_client()
+    return status
+
+
+__all__ = [
+    'extract_from_website',
+    'extract_from_website_async',
+    'extract_from_video',
+    'canonicalize',
+    'CanonicalURL',
+    'is_video_url',
+    'shutdown_parse_pool',
+    'warm_up'
+]
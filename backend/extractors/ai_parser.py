@@ -1,9 +1,9 @@
 import json
 from typing import Optional, Dict, Any
-from openai import OpenAI
-from config import OPENAI_API_KEY
-
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+from metrics import stage, record_tokens, record_error
+from deadline import Deadline
+from config import LLM_ESTIMATE
+from extractors.openai_client import get_openai_client
 
 RECIPE_EXTRACTION_PROMPT = """You are a recipe extraction expert. Analyze the following text (which may be a video transcript, description, or webpage content) and extract the recipe information.
 
@@ -29,8 +29,10 @@ Text to analyze:
 """
 
 
-def parse_recipe_with_ai(text: str, title: str = "", platform: str = "unknown") -> Optional[Dict[str, Any]]:
+def parse_recipe_with_ai(text: str, title: str = "", platform: str = "unknown",
+                         deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Use AI to parse unstructured text into a recipe format."""
+    client = get_openai_client()
     if not client:
         return {
             "error": "OpenAI API key not configured. Please add OPENAI_API_KEY to your .env file."
@@ -41,26 +43,39 @@ def parse_recipe_with_ai(text: str, title: str = "", platform: str = "unknown")
             "error": "Not enough text content to extract a recipe."
         }
     
+    # Half the usual budget is enough for a short completion; less is not worth starting
+    if deadline and not deadline.allows(LLM_ESTIMATE / 2):
+        deadline.skip("llm")
+        return {
+            "error": "Not enough time left to parse the recipe."
+        }
+    request_options = {"timeout": deadline.timeout(120)} if deadline else {}
+    
     try:
         # Combine title and text for better context
         full_text = f"Title: {title}\n\nContent:\n{text[:8000]}"  # Limit text length
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that extracts recipe information from text. Always respond with valid JSON."
-                },
-                {
-                    "role": "user",
-                    "content": RECIPE_EXTRACTION_PROMPT + full_text
-                }
-            ],
-            temperature=0.3,
-            max_tokens=2000,
-            response_format={"type": "json_object"}
-        )
+        with stage("llm"):
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a helpful assistant that extracts recipe information from text. Always respond with valid JSON."
+                    },
+                    {
+                        "role": "user",
+                        "content": RECIPE_EXTRACTION_PROMPT + full_text
+                    }
+                ],
+                temperature=0.3,
+                max_tokens=2000,
+                response_format={"type": "json_object"},
+                **request_options
+            )
+        
+        if response.usage:
+            record_tokens(response.usage.prompt_tokens, response.usage.completion_tokens)
         
         result = json.loads(response.choices[0].message.content)
         
@@ -75,15 +90,19 @@ def parse_recipe_with_ai(text: str, title: str = "", platform: str = "unknown")
         
     except json.JSONDecodeError as e:
         print(f"JSON parse error: {e}")
+        record_error("llm", e)
         return {"error": "Failed to parse AI response"}
     except Exception as e:
         print(f"AI parsing error: {e}")
+        record_error("llm", e)
+        if deadline and deadline.ran_out(e):
+            deadline.skip("llm")
         return {"error": f"AI processing failed: {str(e)}"}
 
 
 def enhance_website_recipe(recipe: Dict[str, Any]) -> Dict[str, Any]:
     """Use AI to enhance/clean up a website-extracted recipe if needed."""
-    if not client:
+    if not get_openai_client():
         return recipe
     
     # If recipe already looks good, return as-is
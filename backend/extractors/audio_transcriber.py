@@ -1,14 +1,16 @@
 import os
 import tempfile
 from typing import Optional
-from openai import OpenAI
-import yt_dlp
-from config import OPENAI_API_KEY
+from lazy import lazy_import
+from metrics import stage, record_bytes, record_error
+from deadline import Deadline
+from extractors.openai_client import get_openai_client
 
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+yt_dlp = lazy_import("yt_dlp")
 
 
-def download_audio(url: str) -> Optional[str]:
+@stage("audio_download")
+def download_audio(url: str, deadline: Optional[Deadline] = None) -> Optional[str]:
     """Download audio from a video URL and return the file path."""
     try:
         # Create a temp file for the audio
@@ -27,6 +29,14 @@ def download_audio(url: str) -> Optional[str]:
             'prefer_ffmpeg': False,
         }
         
+        if deadline:
+            # Abort the download mid-stream once the request budget is gone
+            def check_deadline(progress):
+                deadline.check()
+
+            ydl_opts['socket_timeout'] = deadline.timeout(30)
+            ydl_opts['progress_hooks'] = [check_deadline]
+        
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=True)
             
@@ -46,33 +56,48 @@ def download_audio(url: str) -> Optional[str]:
         
     except Exception as e:
         print(f"Audio download error: {e}")
+        record_error("audio_download", e)
         return None
 
 
-def transcribe_audio(audio_path: str) -> Optional[str]:
+@stage("whisper")
+def transcribe_audio(audio_path: str, deadline: Optional[Deadline] = None) -> Optional[str]:
     """Transcribe audio file using OpenAI Whisper API."""
-    if not client:
-        print("OpenAI client not configured")
-        return None
-    
-    # Check file size - Whisper has a 25MB limit
-    file_size = os.path.getsize(audio_path)
-    if file_size > 25 * 1024 * 1024:
-        print(f"Audio file too large: {file_size / (1024*1024):.1f}MB (max 25MB)")
-        return None
-        
     try:
+        client = get_openai_client()
+        if not client:
+            print("OpenAI client not configured")
+            return None
+        
+        # Check file size - Whisper has a 25MB limit
+        file_size = os.path.getsize(audio_path)
+        record_bytes("audio", file_size)
+        if file_size > 25 * 1024 * 1024:
+            print(f"Audio file too large: {file_size / (1024*1024):.1f}MB (max 25MB)")
+            return None
+        
+        if deadline and deadline.expired:
+            deadline.skip("whisper")
+            return None
+        
+        # Only override the client's default timeout when there is a budget
+        request_options = {"timeout": deadline.timeout(600)} if deadline else {}
         with open(audio_path, 'rb') as audio_file:
             # Use Whisper API for transcription
             transcript = client.audio.transcriptions.create(
                 model="whisper-1",
                 file=audio_file,
-                response_format="text"
+                response_format="text",
+                **request_options
             )
         return transcript
         
     except Exception as e:
         print(f"Transcription error: {e}")
+        record_error("whisper", e)
+        if deadline and deadline.ran_out(e):
+            # Flag the result as partial so it is not cached as a full one
+            deadline.skip("whisper")
         return None
     finally:
         # Clean up the audio file
@@ -83,17 +108,19 @@ def transcribe_audio(audio_path: str) -> Optional[str]:
             pass
 
 
-def transcribe_video(url: str) -> Optional[str]:
+def transcribe_video(url: str, deadline: Optional[Deadline] = None) -> Optional[str]:
     """Download and transcribe audio from a video URL."""
     print(f"Downloading audio from: {url}")
-    audio_path = download_audio(url)
+    audio_path = download_audio(url, deadline)
     
     if not audio_path:
+        if deadline and deadline.expired:
+            deadline.skip("audio_download")
         print("Failed to download audio")
         return None
     
     print(f"Transcribing audio: {audio_path}")
-    transcript = transcribe_audio(audio_path)
+    transcript = transcribe_audio(audio_path, deadline)
     
     if transcript:
         print(f"Transcription successful: {len(transcript)} characters")
@@ -0,0 +1,14 @@
+from config import OPENAI_API_KEY
+from lazy import lazy_import
+
+openai = lazy_import("openai")
+
+_client = None
+
+
+def get_openai_client():
+    """Return the shared OpenAI client, creating it on first use (None without a key)."""
+    global _client
+    if _client is None and OPENAI_API_KEY:
+        _client = openai.OpenAI(api_key=OPENAI_API_KEY)
+    return _client
@@ -0,0 +1,94 @@
+import sys
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any
+from config import PARSE_POOL_SIZE, PARSE_POOL_MAX_TASKS, PARSE_TIMEOUT
+from metrics import stage, record_error, capture_worker_metrics, replay_worker_metrics
+from extractors.website_extractor import fetch_html, parse_html_bytes
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        options = {}
+        if sys.version_info >= (3, 11):
+            # Worker recycling needs Python 3.11+ and is not supported with fork
+            options["max_tasks_per_child"] = PARSE_POOL_MAX_TASKS or None
+        _pool = ProcessPoolExecutor(
+            max_workers=PARSE_POOL_SIZE,
+            mp_context=multiprocessing.get_context("spawn"),
+            **options
+        )
+    return _pool
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _parse_in_worker(content: bytes, encoding: Optional[str], url: str):
+    """Pool entry point: parse, returning the worker's stage timings and errors too."""
+    timings, errors = capture_worker_metrics()
+    return parse_html_bytes(content, encoding, url), timings, errors
+
+
+def _terminate_pool(pool: ProcessPoolExecutor) -> None:
+    """Kill a pool's workers so a stuck parse cannot keep holding a slot."""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+async def parse_html_async(content: bytes, encoding: Optional[str], url: str) -> Optional[Dict[str, Any]]:
+    """Parse page bytes in the parse pool, off the event loop and the GIL."""
+    with stage("parse"):
+        if not PARSE_POOL_SIZE:
+            return await asyncio.to_thread(parse_html_bytes, content, encoding, url)
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = _get_pool()
+            future = loop.run_in_executor(pool, _parse_in_worker, content, encoding, url)
+            try:
+                recipe, timings, errors = await asyncio.wait_for(future, timeout=PARSE_TIMEOUT)
+                replay_worker_metrics(timings, errors)
+                return recipe
+            except asyncio.TimeoutError as e:
+                # Waiting is not enough: the worker would keep parsing and block later
+                # pages, so the pool is replaced and its workers killed
+                print(f"HTML parsing timed out after {PARSE_TIMEOUT}s, restarting parse pool: {url}")
+                record_error("parse", e)
+                _terminate_pool(pool)
+                return None
+            except BrokenProcessPool as e:
+                # A worker crashed, or the pool was killed for another page's timeout;
+                # retry once on a fresh pool
+                print(f"Parse pool crashed, restarting: {e}")
+                record_error("parse", e)
+                _terminate_pool(pool)
+                if attempt:
+                    return None
+        return None
+
+
+async def extract_from_website_async(url: str) -> Optional[Dict[str, Any]]:
+    """Async extract_from_website: fetch in a thread, parse in the process pool."""
+    try:
+        content, encoding = await asyncio.to_thread(fetch_html, url)
+    except Exception as e:
+        print(f"Website extraction error: {e}")
+        record_error("fetch", e)
+        return None
+
+    return await parse_html_async(content, encoding, url)
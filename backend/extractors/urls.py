@@ -0,0 +1,166 @@
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class CanonicalURL(NamedTuple):
+    key: str                    # stable cache/routing key
+    url: str                    # cleaned URL to fetch
+    platform: Optional[str]     # video platform, or None for websites
+    content_id: Optional[str]   # platform video id when known
+
+
+# Query parameters that never change page content
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "igsh", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "referrer", "si", "feature", "share_id", "_r",
+    "amp", "print", "is_from_webapp", "sender_device", "_t", "pp",
+})
+TRACKING_PREFIXES = ("utm_", "_hs", "pk_", "mtm_")
+
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+
+# scheme://netloc/path?query#fragment in one pass; cheaper than urllib's urlsplit
+URL_PARTS = re.compile(r"^(?:([A-Za-z][A-Za-z0-9+.-]*):)?//([^/?#]*)([^?#]*)(?:\?([^#]*))?")
+
+# Trailing path segments for AMP and print variants of the same page
+VARIANT_SUFFIX = re.compile(r"/(?:amp|print|wprm_print)/?$", re.IGNORECASE)
+
+YOUTUBE_PATH = re.compile(r"^/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})")
+YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+TIKTOK_PATH = re.compile(r"/video/(\d+)")
+INSTAGRAM_PATH = re.compile(r"^/(?:reels?|p|tv)/([A-Za-z0-9_-]+)")
+VIMEO_PATH = re.compile(r"^/(?:video/)?(\d+)")
+
+
+def _youtube(path: str, query: Dict[str, str]) -> Tuple[bool, Optional[str]]:
+    video_id = query.get("v")
+    if video_id and YOUTUBE_ID.match(video_id):
+        return True, video_id
+    match = YOUTUBE_PATH.match(path)
+    return True, match.group(1) if match else None
+
+
+def _youtu_be(path: str, query: Dict[str, str]) -> Tuple[bool, Optional[str]]:
+    video_id = path.strip("/").split("/", 1)[0]
+    return True, video_id if YOUTUBE_ID.match(video_id) else None
+
+
+def _tiktok(path: str, query: Dict[str, str]) -> Tuple[bool, Optional[str]]:
+    match = TIKTOK_PATH.search(path)
+    return True, match.group(1) if match else None
+
+
+def _instagram(path: str, query: Dict[str, str]) -> Tuple[bool, Optional[str]]:
+    # Only posts and reels are videos; profile pages are not
+    match = INSTAGRAM_PATH.match(path)
+    return (True, match.group(1)) if match else (False, None)
+
+
+def _vimeo(path: str, query: Dict[str, str]) -> Tuple[bool, Optional[str]]:
+    match = VIMEO_PATH.match(path)
+    return True, match.group(1) if match else None
+
+
+# Normalized host -> (platform, id extractor). A single dict lookup routes a URL.
+PLATFORM_ROUTES: Dict[str, Tuple[str, Callable]] = {
+    "youtube.com": ("youtube", _youtube),
+    "music.youtube.com": ("youtube", _youtube),
+    "youtube-nocookie.com": ("youtube", _youtube),
+    "youtu.be": ("youtube", _youtu_be),
+    "tiktok.com": ("tiktok", _tiktok),
+    "vm.tiktok.com": ("tiktok", _tiktok),
+    "vt.tiktok.com": ("tiktok", _tiktok),
+    "instagram.com": ("instagram", _instagram),
+    "vimeo.com": ("vimeo", _vimeo),
+    "player.vimeo.com": ("vimeo", _vimeo),
+}
+
+PLATFORM_URLS = {
+    "youtube": "https://www.youtube.com/watch?v={}",
+    "vimeo": "https://vimeo.com/{}",
+    "instagram": "https://www.instagram.com/reel/{}/",
+}
+
+
+def _normalize_host(host: str) -> str:
+    host = host.lower().rstrip(".")
+    if ":" in host:
+        name, _, port = host.rpartition(":")
+        if port in ("80", "443"):
+            host = name
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+def _split_query(query: str) -> List[Tuple[str, str]]:
+    """Split a raw query string, keeping values encoded as-is, minus tracking params."""
+    params = []
+    for pair in query.split("&"):
+        if not pair:
+            continue
+        key, _, value = pair.partition("=")
+        if not _is_tracking(key):
+            params.append((key, value))
+    return params
+
+
+def _join_query(params: List[Tuple[str, str]]) -> str:
+    return "&".join(f"{k}={v}" if v else k for k, v in params)
+
+
+def _page_key(host: str, path: str, params: List[Tuple[str, str]]) -> str:
+    path = path.rstrip("/") or "/"
+    return f"{host}{path}" + (f"?{_join_query(sorted(params))}" if params else "")
+
+
+def _rebuild(scheme: str, netloc: str, path: str, params: List[Tuple[str, str]]) -> str:
+    url = f"{scheme}://{netloc}{path or '/'}"
+    return f"{url}?{_join_query(params)}" if params else url
+
+
+@lru_cache(maxsize=4096)
+def canonicalize(url: str) -> CanonicalURL:
+    """Normalize any recipe/video URL into a routing and caching key.
+
+    Tracking parameters, fragments, www./m. hosts and AMP/print variants are
+    folded together; video URLs resolve to (platform, content id).
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+
+    parts = URL_PARTS.match(url)
+    if parts is None:
+        # Not a URL (e.g. "see http://..."); keep it as-is so fetching fails cleanly
+        return CanonicalURL(url, url, None, None)
+    scheme, netloc, path, query = parts.groups()
+    scheme = (scheme or "https").lower()
+    netloc = netloc.rsplit("@", 1)[-1].lower()
+    host = _normalize_host(netloc)
+    params = _split_query(query) if query else []
+
+    route = PLATFORM_ROUTES.get(host)
+    if route:
+        platform, extract_id = route
+        is_video, content_id = extract_id(path, dict(params))
+        if is_video:
+            if content_id and platform in PLATFORM_URLS:
+                return CanonicalURL(f"{platform}:{content_id}", PLATFORM_URLS[platform].format(content_id),
+                                    platform, content_id)
+            if content_id:
+                return CanonicalURL(f"{platform}:{content_id}", _rebuild(scheme, netloc, path, params),
+                                    platform, content_id)
+            return CanonicalURL(f"{platform}:{_page_key(host, path, params)}",
+                                _rebuild(scheme, netloc, path, params), platform, None)
+
+    # Keep the original host and trailing slash when fetching; some sites need them
+    path = VARIANT_SUFFIX.sub("/", path)
+    return CanonicalURL(_page_key(host, path, params), _rebuild(scheme, netloc, path, params), None, None)
@@ -1,23 +1,23 @@
-import re
 import json
 from typing import Optional, Dict, Any
-import yt_dlp
 import requests
+from lazy import lazy_import
+from metrics import stage, record_bytes, record_error, record_cache
+from backends import get_backend
+from config import VIDEO_CACHE_TTL, LLM_ESTIMATE
+from deadline import Deadline, transcription_estimate
+from extractors.urls import canonicalize
+
+yt_dlp = lazy_import("yt_dlp")
 
 
 def extract_youtube_id(url: str) -> Optional[str]:
     """Extract YouTube video ID from URL."""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/shorts\/([a-zA-Z0-9_-]{11})',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+    canonical = canonicalize(url)
+    return canonical.content_id if canonical.platform == "youtube" else None
 
 
+@stage("captions")
 def get_youtube_transcript(video_id: str) -> Optional[str]:
     """Get transcript from YouTube video using yt-dlp."""
     try:
@@ -59,6 +59,7 @@ def get_youtube_transcript(video_id: str) -> Optional[str]:
             if caption_url:
                 # Fetch and parse the captions
                 response = requests.get(caption_url, timeout=10)
+                record_bytes("captions", len(response.content))
                 if response.ok:
                     caption_data = response.json()
                     events = caption_data.get('events', [])
@@ -75,9 +76,11 @@ def get_youtube_transcript(video_id: str) -> Optional[str]:
             
     except Exception as e:
         print(f"YouTube transcript error: {e}")
+        record_error("captions", e)
         return None
 
 
+@stage("ytdlp_info")
 def get_video_info_yt_dlp(url: str) -> Dict[str, Any]:
     """Get video info using yt-dlp (works for YouTube, TikTok, Instagram, etc.)."""
     ydl_opts = {
@@ -103,25 +106,52 @@ def get_video_info_yt_dlp(url: str) -> Dict[str, Any]:
             
     except Exception as e:
         print(f"yt-dlp error: {e}")
+        record_error("ytdlp_info", e)
         return {}
 
 
-def extract_from_video(url: str) -> Optional[Dict[str, Any]]:
-    """Extract video information and transcript."""
+def _cached(kind: str, key: str, compute):
+    """Share a yt-dlp/caption/transcript result through the cache backend."""
+    backend = get_backend()
+    cache_key = f"{kind}:{key}"
+    value = backend.get(cache_key)
+    record_cache(kind, value is not None)
+    if value is None:
+        value = compute()
+        if value:
+            backend.set(cache_key, value, VIDEO_CACHE_TTL)
+    return value
+
+
+def _transcribe(url: str, video_info: Dict[str, Any], deadline: Optional[Deadline]) -> Optional[str]:
+    """Transcribe the audio, unless it cannot finish (plus an LLM parse) in the budget."""
+    if deadline and not deadline.allows(transcription_estimate(video_info.get('duration')), reserve=LLM_ESTIMATE):
+        print("Skipping audio transcription: not enough time left")
+        deadline.skip("transcription")
+        return None
+    from extractors.audio_transcriber import transcribe_video
+    return _cached("transcript", url, lambda: transcribe_video(url, deadline))
+
+
+def extract_from_video(url: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+    """Extract video information and transcript.
+
+    With a deadline, audio transcription is skipped when it cannot finish in
+    time; the result then only carries the title and description.
+    """
     try:
         # Check if it's YouTube
         youtube_id = extract_youtube_id(url)
         
         if youtube_id:
             # Get YouTube transcript (free, from captions)
-            transcript = get_youtube_transcript(youtube_id)
-            video_info = get_video_info_yt_dlp(url)
+            transcript = _cached("captions", youtube_id, lambda: get_youtube_transcript(youtube_id))
+            video_info = _cached("ytinfo", url, lambda: get_video_info_yt_dlp(url))
             
             # If no captions available, try audio transcription
             if not transcript:
                 print("No YouTube captions found, trying audio transcription...")
-                from extractors.audio_transcriber import transcribe_video
-                transcript = transcribe_video(url)
+                transcript = _transcribe(url, video_info, deadline)
             
             return {
                 'title': video_info.get('title', ''),
@@ -133,12 +163,11 @@ def extract_from_video(url: str) -> Optional[Dict[str, Any]]:
             }
         else:
             # Use yt-dlp for other platforms (TikTok, Instagram, etc.)
-            video_info = get_video_info_yt_dlp(url)
+            video_info = _cached("ytinfo", url, lambda: get_video_info_yt_dlp(url))
             
             # For TikTok/Instagram, transcribe the audio since they don't have captions
             print(f"Transcribing {video_info.get('platform', 'video')} audio...")
-            from extractors.audio_transcriber import transcribe_video
-            transcript = transcribe_video(url)
+            transcript = _transcribe(url, video_info, deadline)
             
             return {
                 'title': video_info.get('title', ''),
@@ -151,21 +180,10 @@ def extract_from_video(url: str) -> Optional[Dict[str, Any]]:
             
     except Exception as e:
         print(f"Video extraction error: {e}")
+        record_error("video", e)
         return None
 
 
 def is_video_url(url: str) -> bool:
     """Check if URL is from a video platform."""
-    video_patterns = [
-        r'youtube\.com',
-        r'youtu\.be',
-        r'tiktok\.com',
-        r'instagram\.com/reel',
-        r'instagram\.com/p/',
-        r'vimeo\.com',
-    ]
-    
-    for pattern in video_patterns:
-        if re.search(pattern, url, re.IGNORECASE):
-            return True
-    return False
+    return canonicalize(url).platform is not None
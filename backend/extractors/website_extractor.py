@@ -1,58 +1,98 @@
 import json
 import re
-from typing import Optional, Dict, Any
-from recipe_scrapers import scrape_html
+from typing import Optional, Dict, Any, Tuple
 import requests
-from bs4 import BeautifulSoup
+from requests.compat import chardet
+from lazy import lazy_import
+from metrics import stage, record_bytes, record_error
+
+recipe_scrapers = lazy_import("recipe_scrapers")
+bs4 = lazy_import("bs4")
+
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+
+def fetch_html(url: str) -> Tuple[bytes, Optional[str]]:
+    """Fetch a page and return its raw bytes and declared encoding, if any."""
+    with stage("fetch"):
+        response = requests.get(url, headers=HEADERS, timeout=15)
+        response.raise_for_status()
+    record_bytes("website", len(response.content))
+    # requests assumes ISO-8859-1 for text/* without a charset; leave those to detection
+    declared = "charset" in response.headers.get("content-type", "").lower()
+    return response.content, response.encoding if declared else None
 
 
 def extract_from_website(url: str) -> Optional[Dict[str, Any]]:
     """Extract recipe from a website URL using recipe-scrapers library."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        html = response.text
-        
-        # Try recipe-scrapers first
-        try:
-            scraper = scrape_html(html, org_url=url)
-            
-            recipe = {
-                "title": scraper.title() if hasattr(scraper, 'title') else "Unknown Recipe",
-                "ingredients": scraper.ingredients() if hasattr(scraper, 'ingredients') else [],
-                "instructions": scraper.instructions_list() if hasattr(scraper, 'instructions_list') else [scraper.instructions()] if hasattr(scraper, 'instructions') else [],
-                "prep_time": str(scraper.prep_time()) if hasattr(scraper, 'prep_time') and scraper.prep_time() else None,
-                "cook_time": str(scraper.cook_time()) if hasattr(scraper, 'cook_time') and scraper.cook_time() else None,
-                "total_time": str(scraper.total_time()) if hasattr(scraper, 'total_time') and scraper.total_time() else None,
-                "servings": str(scraper.yields()) if hasattr(scraper, 'yields') and scraper.yields() else None,
-                "image_url": scraper.image() if hasattr(scraper, 'image') else None,
-                "source_url": url,
-                "source_type": "website"
-            }
-            
-            # Clean up empty instructions
-            if recipe["instructions"] and isinstance(recipe["instructions"], list):
-                recipe["instructions"] = [i.strip() for i in recipe["instructions"] if i and i.strip()]
-            
-            return recipe
-            
-        except Exception as e:
-            print(f"recipe-scrapers failed: {e}")
-            # Fall back to JSON-LD extraction
-            return extract_json_ld(html, url)
+        content, encoding = fetch_html(url)
+        return extract_from_html(decode_html(content, encoding), url)
             
     except Exception as e:
         print(f"Website extraction error: {e}")
+        record_error("fetch", e)
         return None
 
 
+def decode_html(content: bytes, encoding: Optional[str]) -> str:
+    """Decode page bytes, detecting the charset like requests' apparent_encoding when none was declared."""
+    if not encoding:
+        encoding = chardet.detect(content)["encoding"] or "utf-8"
+    return content.decode(encoding, errors="replace")
+
+
+def parse_html_bytes(content: bytes, encoding: Optional[str], url: str) -> Optional[Dict[str, Any]]:
+    """Parse raw page bytes into a compact recipe dict (process pool entry point)."""
+    return extract_from_html(decode_html(content, encoding), url)
+
+
+def extract_from_html(html: str, url: str) -> Optional[Dict[str, Any]]:
+    """Extract recipe from already-fetched HTML, falling back to JSON-LD."""
+    # Try recipe-scrapers first
+    try:
+        with stage("scrape"):
+            return extract_with_scrapers(html, url)
+        
+    except Exception as e:
+        print(f"recipe-scrapers failed: {e}")
+        record_error("scrape", e)
+        # Fall back to JSON-LD extraction
+        with stage("jsonld"):
+            return extract_json_ld(html, url)
+
+
+def extract_with_scrapers(html: str, url: str) -> Dict[str, Any]:
+    """Extract recipe with recipe-scrapers. Raises if the page is unsupported."""
+    scraper = recipe_scrapers.scrape_html(html, org_url=url)
+    
+    recipe = {
+        "title": scraper.title() if hasattr(scraper, 'title') else "Unknown Recipe",
+        "ingredients": scraper.ingredients() if hasattr(scraper, 'ingredients') else [],
+        "instructions": scraper.instructions_list() if hasattr(scraper, 'instructions_list') else [scraper.instructions()] if hasattr(scraper, 'instructions') else [],
+        "prep_time": str(scraper.prep_time()) if hasattr(scraper, 'prep_time') and scraper.prep_time() else None,
+        "cook_time": str(scraper.cook_time()) if hasattr(scraper, 'cook_time') and scraper.cook_time() else None,
+        "total_time": str(scraper.total_time()) if hasattr(scraper, 'total_time') and scraper.total_time() else None,
+        "servings": str(scraper.yields()) if hasattr(scraper, 'yields') and scraper.yields() else None,
+        "image_url": scraper.image() if hasattr(scraper, 'image') else None,
+        "source_url": url,
+        "source_type": "website"
+    }
+    
+    # Clean up empty instructions
+    if recipe["instructions"] and isinstance(recipe["instructions"], list):
+        recipe["instructions"] = [i.strip() for i in recipe["instructions"] if i and i.strip()]
+    
+    return recipe
+
+
 def extract_json_ld(html: str, url: str) -> Optional[Dict[str, Any]]:
     """Extract recipe from JSON-LD structured data."""
     try:
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = bs4.BeautifulSoup(html, 'html.parser')
         scripts = soup.find_all('script', type='application/ld+json')
         
         for script in scripts:
@@ -107,4 +147,5 @@ def extract_json_ld(html: str, url: str) -> Optional[Dict[str, Any]]:
         
     except Exception as e:
         print(f"JSON-LD extraction error: {e}")
+        record_error("jsonld", e)
         return None
@@ -0,0 +1,275 @@
+import io
+import os
+import hmac
+import socket
+import asyncio
+import hashlib
+import ipaddress
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlencode, urljoin, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    SECRET_KEY,
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_BYTES,
+    IMAGE_MAX_ORIGIN_BYTES,
+    IMAGE_MAX_PIXELS,
+    IMAGE_PROXY_ALLOW_PRIVATE
+)
+from lazy import lazy_import
+from metrics import stage, record_bytes, record_cache
+
+PIL_Image = lazy_import("PIL.Image")
+PIL_ImageOps = lazy_import("PIL.ImageOps")
+
+# Target widths; aspect ratio is preserved and images are never upscaled
+THUMBNAIL_SIZES = {"small": 400, "medium": 800, "large": 1200}
+WEBP_QUALITY = 80
+MAX_REDIRECTS = 3
+
+
+class ImageProxyError(Exception):
+    """Raised when an origin image cannot be fetched or decoded."""
+
+
+def sign_url(url: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), url.encode(), hashlib.sha256).hexdigest()[:20]
+
+
+def verify_signature(url: str, signature: str) -> bool:
+    return hmac.compare_digest(sign_url(url), signature or "")
+
+
+def thumbnail_urls(image_url: Optional[str]) -> Optional[Dict[str, str]]:
+    """Signed /api/images URLs for each thumbnail size of an origin image."""
+    if not image_url or not image_url.startswith(("http://", "https://")):
+        return None
+    query = urlencode({"url": image_url, "sig": sign_url(image_url)})
+    return {size: f"/api/images/{size}?{query}" for size in THUMBNAIL_SIZES}
+
+
+class DiskLRUCache:
+    """Size-bounded file cache; file mtime doubles as the last-access time."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total = sum(
+            entry.stat().st_size for entry in os.scandir(directory) if entry.is_file()
+        )
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, data: bytes) -> str:
+        path = self.path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total += len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+        return path
+
+    def _evict(self) -> None:
+        entries = sorted(
+            (e for e in os.scandir(self.directory) if e.is_file() and not e.name.endswith(".tmp")),
+            key=lambda e: e.stat().st_mtime,
+        )
+        self._total = sum(e.stat().st_size for e in entries)
+        # Evict down to 90% so we don't rescan on every write
+        for entry in entries:
+            if self._total <= self.max_bytes * 0.9:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._total -= size
+            except FileNotFoundError:
+                pass
+
+
+def _check_host(url: str) -> Optional[str]:
+    """Validate an origin URL and return the vetted address to connect to.
+
+    Returns None when private origins are allowed, in which case the
+    normal resolver is used.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ImageProxyError("Only http(s) image URLs are supported")
+    if IMAGE_PROXY_ALLOW_PRIVATE:
+        return None
+    try:
+        addresses = [info[4][0] for info in socket.getaddrinfo(parts.hostname, parts.port or 443)]
+    except socket.gaierror as e:
+        raise ImageProxyError(f"Could not resolve image host: {e}")
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%", 1)[0]).is_global:
+            raise ImageProxyError("Image host resolves to a private address")
+    return addresses[0]
+
+
+class _PinnedAdapter(HTTPAdapter):
+    """Connect to a pre-resolved IP but keep SNI and certificate checks on the hostname."""
+
+    def __init__(self, hostname: str, **kwargs):
+        self.hostname = hostname
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["server_hostname"] = self.hostname
+        kwargs["assert_hostname"] = self.hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _pinned_request(session: requests.Session, url: str, address: Optional[str], headers: Dict[str, str]):
+    """GET url, connecting to the already-vetted address so DNS cannot be rebound in between."""
+    if address is None:
+        return session.get(url, headers=headers, timeout=15, stream=True, allow_redirects=False)
+
+    parts = urlsplit(url)
+    host = f"[{address}]" if ":" in address else address
+    netloc = f"{host}:{parts.port}" if parts.port else host
+    session.mount(f"{parts.scheme}://", _PinnedAdapter(parts.hostname))
+    pinned_url = urlunsplit((parts.scheme, netloc, parts.path or "/", parts.query, ""))
+    host_header = f"{parts.hostname}:{parts.port}" if parts.port else parts.hostname
+    return session.get(pinned_url, headers={**headers, "Host": host_header},
+                       timeout=15, stream=True, allow_redirects=False)
+
+
+def _read_image(response: requests.Response) -> bytes:
+    with response:
+        if not response.ok:
+            raise ImageProxyError(f"Origin returned HTTP {response.status_code}")
+        if not response.headers.get("content-type", "").startswith("image/"):
+            raise ImageProxyError("Origin did not return an image")
+
+        data = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            data += chunk
+            if len(data) > IMAGE_MAX_ORIGIN_BYTES:
+                raise ImageProxyError("Origin image is too large")
+    record_bytes("image", len(data))
+    return bytes(data)
+
+
+def fetch_origin(url: str) -> bytes:
+    """Download an origin image, re-checking the host on every redirect."""
+    headers = {"User-Agent": "Mozilla/5.0 (compatible; RecipeExtractor image proxy)"}
+    for _ in range(MAX_REDIRECTS + 1):
+        address = _check_host(url)
+        with requests.Session() as session:
+            try:
+                with stage("image_fetch"):
+                    response = _pinned_request(session, url, address, headers)
+                if response.is_redirect:
+                    url = urljoin(url, response.headers["location"])
+                    response.close()
+                    continue
+
+                return _read_image(response)
+            except requests.RequestException as e:
+                raise ImageProxyError(f"Could not fetch origin image: {e}")
+
+    raise ImageProxyError("Too many redirects")
+
+
+def make_thumbnails(data: bytes) -> Dict[str, bytes]:
+    """Decode once and encode a WebP for every configured width."""
+    with stage("image_resize"):
+        try:
+            image = PIL_Image.open(io.BytesIO(data))
+        except Exception as e:
+            raise ImageProxyError(f"Could not decode image: {e}")
+
+        # The header gives the size; refuse decompression bombs before decoding
+        if image.width * image.height > IMAGE_MAX_PIXELS:
+            raise ImageProxyError(f"Image is too large: {image.width}x{image.height}")
+
+        try:
+            # JPEGs decode at a reduced scale when every thumbnail is still covered
+            largest = max(THUMBNAIL_SIZES.values())
+            image.draft("RGB", (largest, largest))
+            image.load()
+            # Phone photos are stored sideways with an EXIF orientation tag
+            PIL_ImageOps.exif_transpose(image, in_place=True)
+        except Exception as e:
+            raise ImageProxyError(f"Could not decode image: {e}")
+
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        # Shrink in place from the largest size down, so each resize starts from
+        # the previous thumbnail rather than a copy of the full decode
+        thumbnails = {}
+        for size, width in sorted(THUMBNAIL_SIZES.items(), key=lambda item: item[1], reverse=True):
+            image.thumbnail((width, width * 4), PIL_Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, "WEBP", quality=WEBP_QUALITY, method=4)
+            thumbnails[size] = out.getvalue()
+        return thumbnails
+
+
+class ImageProxy:
+    """Fetch each origin image once and serve its cached WebP thumbnails."""
+
+    def __init__(self, cache: DiskLRUCache):
+        self.cache = cache
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _key(url: str, size: str) -> str:
+        return f"{hashlib.sha256(url.encode()).hexdigest()}-{size}.webp"
+
+    def _generate(self, url: str) -> None:
+        thumbnails = make_thumbnails(fetch_origin(url))
+        for size, data in thumbnails.items():
+            self.cache.put(self._key(url, size), data)
+
+    async def get_thumbnail(self, url: str, size: str) -> str:
+        key = self._key(url, size)
+        path = self.cache.get(key)
+        record_cache("image", path is not None)
+        if path:
+            return path
+
+        # Concurrent requests for any size of the same image share one fetch
+        future = self._inflight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(asyncio.to_thread(self._generate, url))
+            self._inflight[url] = future
+            future.add_done_callback(lambda _: self._inflight.pop(url, None))
+        await asyncio.shield(future)
+
+        path = self.cache.get(key)
+        if not path:
+            raise ImageProxyError("Thumbnail was evicted before it could be served")
+        return path
+
+
+_proxy: Optional[ImageProxy] = None
+
+
+def get_image_proxy() -> ImageProxy:
+    global _proxy
+    if _proxy is None:
+        _proxy = ImageProxy(DiskLRUCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES))
+    return _proxy
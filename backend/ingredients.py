@@ -0,0 +1,181 @@
+import re
+from typing import NamedTuple, Optional, Tuple, List, Dict
+
+# Unit alias -> factor to the dimension's base unit (ml or g). Plural
+# forms are matched by the UNIT regex, so only singulars are listed.
+VOLUME = {
+    "ml": 1, "milliliter": 1, "millilitre": 1,
+    "cl": 10, "dl": 100,
+    "l": 1000, "liter": 1000, "litre": 1000,
+    "tsp": 4.92892, "teaspoon": 4.92892,
+    "tbsp": 14.7868, "tablespoon": 14.7868, "tbs": 14.7868, "tbl": 14.7868,
+    "fl oz": 29.5735, "fluid ounce": 29.5735,
+    "cup": 236.588,
+    "pint": 473.176, "pt": 473.176,
+    "quart": 946.353, "qt": 946.353,
+    "gallon": 3785.41, "gal": 3785.41,
+}
+MASS = {
+    "mg": 0.001, "g": 1, "gr": 1, "gram": 1, "gramme": 1,
+    "kg": 1000, "kilogram": 1000,
+    "oz": 28.3495, "ounce": 28.3495,
+    "lb": 453.592, "lbs": 453.592, "pound": 453.592,
+}
+COUNT_UNITS = {
+    "clove", "can", "tin", "jar", "package", "packet", "pkg", "bag", "box",
+    "pinch", "dash", "slice", "stick", "piece", "handful", "bunch", "sprig",
+    "head", "stalk", "sheet", "fillet", "knob", "sachet", "envelope",
+}
+
+UNICODE_FRACTIONS = {
+    "½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75, "⅕": 0.2,
+    "⅖": 0.4, "⅗": 0.6, "⅘": 0.8, "⅙": 1 / 6, "⅚": 5 / 6, "⅛": 0.125,
+    "⅜": 0.375, "⅝": 0.625, "⅞": 0.875,
+}
+
+_NUMBER = r"(?:\d+\s+\d+/\d+|\d+/\d+|\d*\.\d+|\d+)"
+QUANTITY = re.compile(
+    rf"^\s*(?P<first>{_NUMBER})(?:\s*(?:-|–|to)\s*(?P<second>{_NUMBER}))?\s*"
+)
+PARENTHETICAL = re.compile(r"\([^)]*\)")
+SIZE_WORDS = {"large", "medium", "small", "extra-large", "jumbo", "heaping", "level", "scant", "generous"}
+UNIT_WORDS = sorted(list(VOLUME) + list(MASS) + list(COUNT_UNITS), key=len, reverse=True)
+UNIT = re.compile(
+    r"^(?P<unit>" + "|".join(re.escape(u) for u in UNIT_WORDS) + r")(?:e?s)?\.?(?=\s|$)",
+    re.IGNORECASE,
+)
+
+
+class ParsedIngredient(NamedTuple):
+    raw: str
+    quantity: Optional[float]
+    unit: Optional[str]
+    item: str
+    preparation: Optional[str]
+    base_quantity: Optional[float]   # quantity converted to base_unit
+    base_unit: str                   # "ml", "g", a count unit, or "" for plain counts
+
+
+def _to_number(text: str) -> float:
+    text = text.strip()
+    if " " in text:
+        whole, frac = text.split(None, 1)
+        return float(whole) + _to_number(frac)
+    if "/" in text:
+        num, den = text.split("/", 1)
+        return float(num) / float(den) if float(den) else 0.0
+    return float(text)
+
+
+def _replace_unicode_fractions(text: str) -> str:
+    for char, value in UNICODE_FRACTIONS.items():
+        if char in text:
+            # "1½" -> "1.5", "½" -> "0.5"
+            text = re.sub(rf"(\d*)\s*{char}", lambda m: str((int(m.group(1)) if m.group(1) else 0) + value), text)
+    return text
+
+
+def _singular(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("oes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize_item(item: str) -> str:
+    """Lowercase, drop size words and singularize the last word for grouping."""
+    words = [w for w in re.sub(r"[^\w\s-]", " ", item.lower()).split() if w not in SIZE_WORDS]
+    if words:
+        words[-1] = _singular(words[-1])
+    return " ".join(words)
+
+
+def _resolve_unit(unit: str) -> Tuple[str, float, str]:
+    """Return (display unit, factor to base, base unit) for a matched unit word."""
+    key = re.sub(r"\s+", " ", unit.lower())
+    if key in VOLUME:
+        return key, VOLUME[key], "ml"
+    if key in MASS:
+        return key, MASS[key], "g"
+    return key, 1.0, key
+
+
+def parse_ingredient(text: str) -> ParsedIngredient:
+    """Parse a free-text ingredient line into quantity, unit, item and preparation."""
+    raw = text.strip()
+    rest = PARENTHETICAL.sub(" ", _replace_unicode_fractions(raw))
+
+    quantity = None
+    match = QUANTITY.match(rest)
+    if match:
+        # Ranges ("2-3 cloves") use the upper bound for shopping
+        quantity = _to_number(match.group("second") or match.group("first"))
+        rest = rest[match.end():]
+
+    unit = None
+    factor, base_unit = 1.0, ""
+    unit_match = UNIT.match(rest.strip())
+    if unit_match:
+        unit, factor, base_unit = _resolve_unit(unit_match.group("unit"))
+        rest = rest.strip()[unit_match.end():]
+        rest = re.sub(r"^\s*of\s+", " ", rest)
+
+    item, _, preparation = rest.partition(",")
+    preparation = preparation.strip() or None
+    if re.search(r"\bto taste\b", item, re.IGNORECASE):
+        item = re.sub(r"\s*\bto taste\b", "", item, flags=re.IGNORECASE)
+        preparation = "to taste" if not preparation else f"to taste, {preparation}"
+
+    item = normalize_item(item) or normalize_item(raw)
+    base_quantity = quantity * factor if quantity is not None else None
+    return ParsedIngredient(raw, quantity, unit, item, preparation, base_quantity, base_unit)
+
+
+def parse_ingredients(lines: List[str]) -> List[ParsedIngredient]:
+    return [parse_ingredient(line) for line in lines if line and line.strip()]
+
+
+def _fmt(value: float) -> float:
+    return round(value, 2)
+
+
+def display_quantity(base_quantity: Optional[float], base_unit: str, system: str = "metric") -> Tuple[Optional[float], Optional[str]]:
+    """Convert an aggregated base quantity into a friendly unit."""
+    if base_quantity is None:
+        return None, base_unit or None
+
+    if base_unit == "ml":
+        if system == "us":
+            for unit, size, threshold in (("cup", 236.588, 59), ("tbsp", 14.7868, 14.7), ("tsp", 4.92892, 0)):
+                if base_quantity >= threshold:
+                    return _fmt(base_quantity / size), unit
+        return (_fmt(base_quantity / 1000), "l") if base_quantity >= 1000 else (_fmt(base_quantity), "ml")
+
+    if base_unit == "g":
+        if system == "us":
+            return (_fmt(base_quantity / 453.592), "lb") if base_quantity >= 453.592 else (_fmt(base_quantity / 28.3495), "oz")
+        return (_fmt(base_quantity / 1000), "kg") if base_quantity >= 1000 else (_fmt(base_quantity), "g")
+
+    return _fmt(base_quantity), base_unit or None
+
+
+def ingredient_rows(recipe_id: int, user_id: int, lines: List[str]) -> List[Dict]:
+    """Rows for the recipe_ingredients table, ready for a bulk insert."""
+    return [
+        {
+            "recipe_id": recipe_id,
+            "user_id": user_id,
+            "position": position,
+            "raw": parsed.raw,
+            "quantity": parsed.quantity,
+            "unit": parsed.unit,
+            "item": parsed.item,
+            "preparation": parsed.preparation,
+            "base_quantity": parsed.base_quantity,
+            "base_unit": parsed.base_unit,
+        }
+        for position, parsed in enumerate(parse_ingredients(lines))
+    ]
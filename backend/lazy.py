@@ -0,0 +1,49 @@
+import importlib
+from types import ModuleType
+from typing import Dict
+
+_registry: Dict[str, "LazyModule"] = {}
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a shared lazy handle for a heavy dependency."""
+    if name not in _registry:
+        _registry[name] = LazyModule(name)
+    return _registry[name]
+
+
+def load_all() -> Dict[str, bool]:
+    """Import every registered lazy module; returns which ones loaded."""
+    status = {}
+    for name, module in _registry.items():
+        try:
+            module.load()
+            status[name] = True
+        except ImportError as e:
+            print(f"Warm-up import of {name} failed: {e}")
+            status[name] = False
+    return status
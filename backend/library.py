@@ -0,0 +1,322 @@
+import json
+import zlib
+from typing import Optional, Dict, Any, Iterator, AsyncIterator, List
+
+from pydantic import ValidationError
+from sqlalchemy import insert, case, func, literal, exists
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import SessionLocal, SavedRecipe, LibraryVersion, RecipeIngredient
+from schemas import SaveRecipeRequest
+from ingredients import ingredient_rows, display_quantity
+from config import LIBRARY_BATCH_SIZE, LIBRARY_MAX_LINE_BYTES, LIBRARY_MAX_UPLOAD_BYTES
+
+
+class ImportInterrupted(Exception):
+    """An import stopped part way; earlier batches are already committed."""
+
+    def __init__(self, message: str, imported: int, failed: int):
+        super().__init__(message)
+        self.imported = imported
+        self.failed = failed
+
+
+def get_library_version(db, user_id: int) -> int:
+    version = db.query(LibraryVersion.version).filter(
+        LibraryVersion.user_id == user_id
+    ).scalar()
+    return version or 0
+
+
+UPSERT_DIALECTS = {"sqlite": sqlite, "postgresql": postgresql}
+
+
+def bump_library_version(db, user_id: int) -> None:
+    """Increment a user's library version; the caller commits."""
+    dialect = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect is not None:
+        # One statement, so two first writes for a user cannot both insert the row
+        db.execute(
+            dialect.insert(LibraryVersion).values(user_id=user_id, version=1).on_conflict_do_update(
+                index_elements=[LibraryVersion.user_id],
+                set_={"version": LibraryVersion.version + 1}
+            )
+        )
+        return
+
+    updated = db.query(LibraryVersion).filter(
+        LibraryVersion.user_id == user_id
+    ).update({LibraryVersion.version: LibraryVersion.version + 1})
+    if not updated:
+        db.add(LibraryVersion(user_id=user_id, version=1))
+
+
+def library_etag(user_id: int, version: int, recipe_id: Optional[int] = None) -> str:
+    # Weak: the gzip, brotli and identity encodings of a response share it
+    tag = f"{user_id}-{version}" if recipe_id is None else f"{user_id}-{version}-{recipe_id}"
+    return f'W/"{tag}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weakly compare an If-None-Match header value against the ETag of an existing resource."""
+    if not if_none_match:
+        return False
+    candidates = [_opaque_tag(c.strip()) for c in if_none_match.split(",")]
+    return "*" in candidates or _opaque_tag(etag) in candidates
+
+
+def recipe_to_dict(recipe: SavedRecipe) -> Dict[str, Any]:
+    """Serialize a saved recipe row into a plain export dict."""
+    return {
+        "id": recipe.id,
+        "title": recipe.title,
+        "source_url": recipe.source_url,
+        "image_url": recipe.image_url,
+        "ingredients": json.loads(recipe.ingredients),
+        "instructions": json.loads(recipe.instructions),
+        "prep_time": recipe.prep_time,
+        "cook_time": recipe.cook_time,
+        "servings": recipe.servings,
+        "created_at": recipe.created_at.isoformat() if recipe.created_at else None,
+    }
+
+
+def iter_export_lines(user_id: int) -> Iterator[bytes]:
+    """Yield a user's library as NDJSON lines from a server-side cursor.
+
+    The generator owns its own session so it stays valid for the whole
+    lifetime of the streaming response.
+    """
+    db = SessionLocal()
+    try:
+        rows = db.query(SavedRecipe).filter(
+            SavedRecipe.user_id == user_id
+        ).order_by(SavedRecipe.id).execution_options(
+            stream_results=True
+        ).yield_per(LIBRARY_BATCH_SIZE)
+
+        for recipe in rows:
+            yield (json.dumps(recipe_to_dict(recipe)) + "\n").encode("utf-8")
+    finally:
+        db.close()
+
+
+# Bytes inflated per step, so one small gzip chunk cannot expand all at once
+INFLATE_STEP = 1024 * 1024
+
+
+def _inflate(decompressor, chunk: bytes) -> Iterator[bytes]:
+    while chunk:
+        data = decompressor.decompress(chunk, INFLATE_STEP)
+        chunk = decompressor.unconsumed_tail
+        if data:
+            yield data
+
+
+class _LineSplitter:
+    """Split bytes into lines, keeping at most LIBRARY_MAX_LINE_BYTES of a partial line.
+
+    An over-long line is emitted once, cut to one byte over the limit so
+    import_lines counts it as failed, and the rest of it is dropped.
+    """
+
+    def __init__(self):
+        self.buffer = b""
+        self.oversized = False
+
+    def feed(self, data: bytes) -> List[bytes]:
+        *lines, self.buffer = (self.buffer + data).split(b"\n")
+        if lines and self.oversized:
+            # The end of the over-long line that was already emitted
+            lines.pop(0)
+            self.oversized = False
+        if len(self.buffer) > LIBRARY_MAX_LINE_BYTES:
+            if not self.oversized:
+                lines.append(self.buffer[:LIBRARY_MAX_LINE_BYTES + 1])
+                self.oversized = True
+            self.buffer = b""
+        return lines
+
+    def finish(self) -> List[bytes]:
+        return [self.buffer] if self.buffer and not self.oversized else []
+
+
+async def iter_upload_lines(chunks: AsyncIterator[bytes], gzipped: bool = False) -> AsyncIterator[bytes]:
+    """Split a streamed (optionally gzipped) upload into raw lines.
+
+    Raises ValueError once the (decompressed) upload exceeds
+    LIBRARY_MAX_UPLOAD_BYTES.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    splitter = _LineSplitter()
+    total = 0
+
+    async for chunk in chunks:
+        for data in (_inflate(decompressor, chunk) if decompressor else [chunk]):
+            total += len(data)
+            if total > LIBRARY_MAX_UPLOAD_BYTES:
+                raise ValueError("Upload is too large")
+            for line in splitter.feed(data):
+                yield line
+
+    if decompressor:
+        for line in splitter.feed(decompressor.flush()):
+            yield line
+    for line in splitter.finish():
+        yield line
+
+
+def _recipe_row(data: Dict[str, Any], user_id: int) -> Optional[Dict[str, Any]]:
+    """Validate one imported record and map it to a saved_recipes row."""
+    try:
+        recipe = SaveRecipeRequest(**data)
+    except (ValidationError, TypeError):
+        return None
+
+    return {
+        "title": recipe.title,
+        "source_url": recipe.source_url,
+        "image_url": recipe.image_url,
+        "ingredients": json.dumps(recipe.ingredients),
+        "instructions": json.dumps(recipe.instructions),
+        "prep_time": recipe.prep_time,
+        "cook_time": recipe.cook_time,
+        "servings": recipe.servings,
+        "user_id": user_id,
+    }
+
+
+# Position of the row that marks a recipe with no ingredient lines as indexed,
+# so the backfill does not pick it up again on every shopping list
+INDEXED_MARKER_POSITION = -1
+
+
+def _index_rows(recipe_id: int, user_id: int, ingredients: List[str]) -> List[Dict[str, Any]]:
+    rows = ingredient_rows(recipe_id, user_id, ingredients)
+    return rows or [{
+        "recipe_id": recipe_id,
+        "user_id": user_id,
+        "position": INDEXED_MARKER_POSITION,
+        "item": "",
+        "base_unit": "",
+    }]
+
+
+def index_ingredients(db, recipe_id: int, user_id: int, ingredients: List[str]) -> None:
+    """Parse a recipe's ingredient lines into the ingredient index; the caller commits."""
+    db.execute(insert(RecipeIngredient), _index_rows(recipe_id, user_id, ingredients))
+
+
+def _insert_batch(db, rows: List[Dict[str, Any]], user_id: int) -> None:
+    # A list of parameter dicts makes SQLAlchemy use a single executemany;
+    # RETURNING in parameter order maps the new ids back to their rows
+    recipe_ids = db.execute(
+        insert(SavedRecipe).returning(SavedRecipe.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+
+    index_rows = []
+    for recipe_id, row in zip(recipe_ids, rows):
+        index_rows.extend(_index_rows(recipe_id, user_id, json.loads(row["ingredients"])))
+    if index_rows:
+        db.execute(insert(RecipeIngredient), index_rows)
+
+    bump_library_version(db, user_id)
+    db.commit()
+
+
+async def import_lines(db, lines: AsyncIterator[bytes], user_id: int) -> Dict[str, int]:
+    """Insert NDJSON recipe lines for a user in batched transactions.
+
+    Raises ImportInterrupted with the counts so far if the upload or a
+    batch insert fails; the uncommitted batch is rolled back.
+    """
+    imported = 0
+    failed = 0
+    batch: List[Dict[str, Any]] = []
+
+    try:
+        async for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if len(line) > LIBRARY_MAX_LINE_BYTES:
+                failed += 1
+                continue
+
+            try:
+                row = _recipe_row(json.loads(line), user_id)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                row = None
+
+            if row is None:
+                failed += 1
+                continue
+
+            batch.append(row)
+            if len(batch) >= LIBRARY_BATCH_SIZE:
+                _insert_batch(db, batch, user_id)
+                imported += len(batch)
+                batch = []
+
+        if batch:
+            _insert_batch(db, batch, user_id)
+            imported += len(batch)
+    except Exception as e:
+        db.rollback()
+        raise ImportInterrupted(str(e), imported, failed) from e
+
+    return {"imported": imported, "failed": failed}
+
+
+def _backfill_ingredient_index(db, user_id: int, recipe_ids: List[int]) -> None:
+    """Index recipes saved before the ingredient index existed."""
+    missing = db.query(SavedRecipe.id, SavedRecipe.ingredients).filter(
+        SavedRecipe.user_id == user_id,
+        SavedRecipe.id.in_(recipe_ids),
+        ~exists().where(RecipeIngredient.recipe_id == SavedRecipe.id)
+    ).all()
+    for recipe_id, ingredients in missing:
+        index_ingredients(db, recipe_id, user_id, json.loads(ingredients))
+    if missing:
+        db.commit()
+
+
+def shopping_list(db, user_id: int, recipe_ids: List[int],
+                  scales: Optional[Dict[int, float]] = None,
+                  units: str = "metric") -> List[Dict[str, Any]]:
+    """Aggregate the indexed ingredients of several recipes in one GROUP BY.
+
+    Quantities are summed in their base unit (ml, g or a count unit), so
+    "1 cup" and "4 tbsp" of the same item combine; per-recipe scale
+    factors are applied inside the SUM.
+    """
+    _backfill_ingredient_index(db, user_id, recipe_ids)
+
+    scale = case(scales, value=RecipeIngredient.recipe_id, else_=1.0) if scales else literal(1.0)
+    rows = db.query(
+        RecipeIngredient.item,
+        RecipeIngredient.base_unit,
+        func.sum(RecipeIngredient.base_quantity * scale),
+        func.count(func.distinct(RecipeIngredient.recipe_id)),
+    ).filter(
+        RecipeIngredient.user_id == user_id,
+        RecipeIngredient.recipe_id.in_(recipe_ids),
+        RecipeIngredient.position != INDEXED_MARKER_POSITION
+    ).group_by(
+        RecipeIngredient.item, RecipeIngredient.base_unit
+    ).order_by(RecipeIngredient.item).all()
+
+    items = []
+    for item, base_unit, total, recipe_count in rows:
+        quantity, unit = display_quantity(total, base_unit, units)
+        items.append({
+            "item": item,
+            "quantity": quantity,
+            "unit": unit,
+            "recipes": recipe_count,
+        })
+    return items
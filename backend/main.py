@@ -1,16 +1,28 @@
 import json
-from fastapi import FastAPI, Depends, HTTPException, status
+import time
+import asyncio
+from fastapi import FastAPI, Depends, HTTPException, Header, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, Response, FileResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import get_db, init_db, User, SavedRecipe
 from auth import (
-    get_password_hash, 
-    verify_password, 
-    create_access_token, 
+    create_user_token,
     get_current_user,
-    get_optional_user
+    get_optional_user,
+    invalidate_user,
+    get_auth_cache_stats,
+    Principal
+)
+from passwords import (
+    hash_password_async,
+    verify_and_update_async,
+    shutdown_pool,
+    HashingQueueFull
 )
 from schemas import (
     UserCreate, 
@@ -20,10 +32,65 @@ from schemas import (
     RecipeExtractRequest,
     RecipeResponse,
     SaveRecipeRequest,
-    SavedRecipeResponse
+    SavedRecipeResponse,
+    ShoppingListRequest,
+    ShoppingListResponse
+)
+from extractors import (
+    extract_from_website_async,
+    extract_from_video,
+    canonicalize,
+    CanonicalURL,
+    shutdown_parse_pool,
+    warm_up
 )
-from extractors import extract_from_website, extract_from_video, is_video_url
 from extractors.ai_parser import parse_recipe_with_ai
+from library import (
+    iter_export_lines,
+    iter_upload_lines,
+    import_lines,
+    ImportInterrupted,
+    get_library_version,
+    bump_library_version,
+    library_etag,
+    etag_matches,
+    index_ingredients,
+    shopping_list
+)
+from backends import get_backend
+from deadline import Deadline, request_deadline
+from images import get_image_proxy, thumbnail_urls, verify_signature, ImageProxyError, THUMBNAIL_SIZES
+from metrics import (
+    start_request_timing,
+    server_timing_header,
+    record_cache,
+    record_error,
+    render_metrics,
+    CONTENT_TYPE_LATEST
+)
+import metrics
+from profiling import (
+    RequestProfiler,
+    profile_reason,
+    keep_profile,
+    store_profile,
+    profile_store,
+    new_request_id,
+    is_admin
+)
+from prewarm import get_prewarmer
+from config import (
+    COMPRESSION_MIN_SIZE,
+    EXTRACT_CACHE_TTL,
+    WARM_UP_ON_STARTUP,
+    PREWARM_ENABLED,
+    PREWARM_FEEDS
+)
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 
 app = FastAPI(
     title="Recipe Extractor API",
@@ -38,12 +105,82 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Cache", "Server-Timing", "X-Request-ID"],
 )
 
+# Response compression: brotli when available (with gzip fallback), else gzip
+if BrotliMiddleware:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    timings = start_request_timing()
+    start = time.perf_counter()
+    response = await call_next(request)
+    timings.append(("total", (time.perf_counter() - start) * 1000))
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+
+@app.middleware("http")
+async def request_profiling(request: Request, call_next):
+    request_id = new_request_id()
+    reason = profile_reason(request.headers.get("x-profile"))
+    
+    profiler = None
+    if reason:
+        profiler = RequestProfiler()
+        try:
+            profiler.start()
+        except (RuntimeError, ValueError):
+            # Another profiler is already running (cProfile raises ValueError on 3.12+)
+            profiler = None
+    
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        if profiler:
+            profiler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if keep_profile(reason, elapsed_ms):
+                store_profile(request_id, request.method, request.url.path, elapsed_ms,
+                              reason, profiler, request.headers.get("x-request-id"))
+    
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+
 
 @app.on_event("startup")
 async def startup():
     init_db()
+    if WARM_UP_ON_STARTUP:
+        warm_up()
+    if PREWARM_ENABLED and PREWARM_FEEDS:
+        # Workers coordinate through the cache backend; one crawls per cycle
+        app.state.prewarm_task = asyncio.create_task(get_prewarmer().run_forever())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    prewarm_task = getattr(app.state, "prewarm_task", None)
+    if prewarm_task:
+        prewarm_task.cancel()
+    shutdown_pool()
+    shutdown_parse_pool()
+
+
+@app.exception_handler(HashingQueueFull)
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many authentication requests, please retry shortly"},
+        headers={"Retry-After": "1"}
+    )
 
 
 # ==================== AUTH ROUTES ====================
@@ -68,14 +205,23 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     user = User(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=get_password_hash(user_data.password)
+        hashed_password=await hash_password_async(user_data.password)
     )
     db.add(user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent registration took the email or username while we were hashing
+        db.rollback()
+        email_taken = db.query(User).filter(User.email == user_data.email).first() is not None
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered" if email_taken else "Username already taken"
+        )
     db.refresh(user)
     
     # Create token
-    access_token = create_access_token(data={"sub": user.id})
+    access_token = create_user_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -83,25 +229,40 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == user_data.email).first()
     
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if user:
+        valid, new_hash = await verify_and_update_async(user_data.password, user.hashed_password)
+    else:
+        valid, new_hash = False, None
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    access_token = create_access_token(data={"sub": user.id})
+    # Transparently upgrade hashes made with an outdated cost factor
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+        invalidate_user(user.id)
+    
+    access_token = create_user_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @app.get("/api/auth/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 
 # ==================== RECIPE EXTRACTION ROUTES ====================
 
 @app.post("/api/extract", response_model=RecipeResponse)
-async def extract_recipe(request: RecipeExtractRequest):
+async def extract_recipe(
+    request: RecipeExtractRequest,
+    response: Response,
+    x_request_deadline: Optional[str] = Header(None)
+):
     url = request.url.strip()
     
     if not url:
@@ -110,10 +271,50 @@ async def extract_recipe(request: RecipeExtractRequest):
             detail="URL is required"
         )
     
+    # Tracking params, www./m. hosts, AMP/print and short-link variants share one key
+    canonical = canonicalize(url)
+    deadline = request_deadline(x_request_deadline)
+    
+    if EXTRACT_CACHE_TTL <= 0:
+        return await _extract_recipe(canonical, deadline)
+    
+    # Successful results are shared by every worker through the cache backend
+    backend = get_backend()
+    cache_key = f"extract:{canonical.key}"
+    cached = await backend.aget(cache_key)
+    record_cache("extract", cached is not None)
+    if cached is not None:
+        response.headers["Cache-Control"] = f"public, max-age={EXTRACT_CACHE_TTL}"
+        response.headers["X-Cache"] = "HIT"
+        return RecipeResponse(**{**cached, "source_url": canonical.url})
+    
+    response.headers["X-Cache"] = "MISS"
+    uncached = []
+    
+    async def compute():
+        result = await _extract_recipe(canonical, deadline)
+        # Errors and deadline-degraded partial results are never shared
+        if result.error or result.degraded:
+            uncached.append(result)
+            return None
+        return result.model_dump()
+    
+    # Concurrent requests for the same URL wait for a single extraction, but no longer
+    # than their own deadline; then they extract what they can in the time left
+    data = await backend.get_or_compute(cache_key, compute, ttl=EXTRACT_CACHE_TTL,
+                                        max_wait=deadline.remaining())
+    if data is None:
+        return uncached[0]
+    return RecipeResponse(**data)
+
+
+async def _extract_recipe(canonical: CanonicalURL, deadline: Optional[Deadline] = None) -> RecipeResponse:
+    url = canonical.url
+    deadline = deadline or Deadline(None)
     try:
-        if is_video_url(url):
+        if canonical.platform:
             # Extract from video
-            video_data = extract_from_video(url)
+            video_data = extract_from_video(url, deadline)
             
             if not video_data:
                 raise HTTPException(
@@ -128,18 +329,34 @@ async def extract_recipe(request: RecipeExtractRequest):
             if video_data.get('description'):
                 text_content += "\n\n" + video_data['description']
             
-            if not text_content.strip():
+            if not text_content.strip() and not deadline.skipped:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="No transcript or description available for this video"
                 )
             
-            # Parse with AI
+            # Parse with AI (description only if transcription was skipped)
             recipe = parse_recipe_with_ai(
                 text_content, 
                 video_data.get('title', ''),
-                video_data.get('platform', 'video')
-            )
+                video_data.get('platform', 'video'),
+                deadline
+            ) if text_content.strip() else None
+            
+            if (not recipe or "error" in recipe) and deadline.skipped:
+                # Out of time: return what we know about the video rather than nothing
+                return RecipeResponse(
+                    title=video_data.get("title") or "Video Recipe",
+                    ingredients=[],
+                    instructions=[],
+                    image_url=video_data.get("thumbnail"),
+                    thumbnails=thumbnail_urls(video_data.get("thumbnail")),
+                    source_url=url,
+                    source_type="video",
+                    platform=video_data.get("platform"),
+                    degraded=True,
+                    skipped_stages=list(deadline.skipped)
+                )
             
             if not recipe or "error" in recipe:
                 error_msg = recipe.get("error", "Could not extract recipe from video") if recipe else "AI parsing failed"
@@ -160,15 +377,18 @@ async def extract_recipe(request: RecipeExtractRequest):
                 cook_time=recipe.get("cook_time"),
                 servings=recipe.get("servings"),
                 image_url=video_data.get("thumbnail"),
+                thumbnails=thumbnail_urls(video_data.get("thumbnail")),
                 source_url=url,
                 source_type="video",
                 platform=video_data.get("platform"),
-                tips=recipe.get("tips", [])
+                tips=recipe.get("tips", []),
+                degraded=bool(deadline.skipped),
+                skipped_stages=list(deadline.skipped) or None
             )
             
         else:
             # Extract from website
-            recipe = extract_from_website(url)
+            recipe = await extract_from_website_async(url)
             
             if not recipe:
                 raise HTTPException(
@@ -176,23 +396,13 @@ async def extract_recipe(request: RecipeExtractRequest):
                     detail="Could not extract recipe from this website. The page may not contain a valid recipe."
                 )
             
-            return RecipeResponse(
-                title=recipe.get("title", "Unknown Recipe"),
-                ingredients=recipe.get("ingredients", []),
-                instructions=recipe.get("instructions", []),
-                prep_time=recipe.get("prep_time"),
-                cook_time=recipe.get("cook_time"),
-                total_time=recipe.get("total_time"),
-                servings=recipe.get("servings"),
-                image_url=recipe.get("image_url"),
-                source_url=url,
-                source_type="website"
-            )
+            return RecipeResponse.from_website(recipe, url)
             
     except HTTPException:
         raise
     except Exception as e:
         print(f"Extraction error: {e}")
+        record_error("extract", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to extract recipe: {str(e)}"
@@ -204,7 +414,7 @@ async def extract_recipe(request: RecipeExtractRequest):
 @app.post("/api/recipes/save", response_model=SavedRecipeResponse)
 async def save_recipe(
     recipe_data: SaveRecipeRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     recipe = SavedRecipe(
@@ -219,6 +429,9 @@ async def save_recipe(
         user_id=current_user.id
     )
     db.add(recipe)
+    db.flush()
+    index_ingredients(db, recipe.id, current_user.id, recipe_data.ingredients)
+    bump_library_version(db, current_user.id)
     db.commit()
     db.refresh(recipe)
     
@@ -227,6 +440,7 @@ async def save_recipe(
         title=recipe.title,
         source_url=recipe.source_url,
         image_url=recipe.image_url,
+        thumbnails=thumbnail_urls(recipe.image_url),
         ingredients=json.loads(recipe.ingredients),
         instructions=json.loads(recipe.instructions),
         prep_time=recipe.prep_time,
@@ -238,9 +452,16 @@ async def save_recipe(
 
 @app.get("/api/recipes", response_model=List[SavedRecipeResponse])
 async def get_saved_recipes(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    etag = library_etag(current_user.id, get_library_version(db, current_user.id))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     recipes = db.query(SavedRecipe).filter(
         SavedRecipe.user_id == current_user.id
     ).order_by(SavedRecipe.created_at.desc()).all()
@@ -251,6 +472,7 @@ async def get_saved_recipes(
             title=r.title,
             source_url=r.source_url,
             image_url=r.image_url,
+            thumbnails=thumbnail_urls(r.image_url),
             ingredients=json.loads(r.ingredients),
             instructions=json.loads(r.instructions),
             prep_time=r.prep_time,
@@ -262,10 +484,73 @@ async def get_saved_recipes(
     ]
 
 
+@app.get("/api/recipes/export")
+async def export_recipes(current_user: Principal = Depends(get_current_user)):
+    # Compression is negotiated by the response compression middleware
+    return StreamingResponse(
+        iter_export_lines(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="recipes.ndjson"'}
+    )
+
+
+@app.post("/api/recipes/import")
+async def import_recipes(
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip"
+    lines = iter_upload_lines(request.stream(), gzipped=gzipped)
+
+    try:
+        return await import_lines(db, lines, current_user.id)
+    except ImportInterrupted as e:
+        # Earlier batches stay committed; report them so the client can resume
+        print(f"Import error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": f"Failed to import recipes: {str(e)}",
+                "imported": e.imported,
+                "failed": e.failed
+            }
+        )
+
+
+@app.post("/api/recipes/shopping-list", response_model=ShoppingListResponse)
+async def get_shopping_list(
+    request: ShoppingListRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    recipe_ids = list(dict.fromkeys(request.recipe_ids))
+    if not recipe_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Select at least one recipe"
+        )
+
+    found = db.query(SavedRecipe.id).filter(
+        SavedRecipe.id.in_(recipe_ids),
+        SavedRecipe.user_id == current_user.id
+    ).count()
+    if found != len(recipe_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipe not found"
+        )
+
+    items = shopping_list(db, current_user.id, recipe_ids, request.scales, request.units)
+    return ShoppingListResponse(recipe_ids=recipe_ids, items=items)
+
+
 @app.get("/api/recipes/{recipe_id}", response_model=SavedRecipeResponse)
 async def get_recipe(
     recipe_id: int,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     recipe = db.query(SavedRecipe).filter(
@@ -279,11 +564,18 @@ async def get_recipe(
             detail="Recipe not found"
         )
     
+    # Checked after the lookup so "If-None-Match: *" never hides a 404
+    etag = library_etag(current_user.id, get_library_version(db, current_user.id), recipe_id)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     return SavedRecipeResponse(
         id=recipe.id,
         title=recipe.title,
         source_url=recipe.source_url,
         image_url=recipe.image_url,
+        thumbnails=thumbnail_urls(recipe.image_url),
         ingredients=json.loads(recipe.ingredients),
         instructions=json.loads(recipe.instructions),
         prep_time=recipe.prep_time,
@@ -296,7 +588,7 @@ async def get_recipe(
 @app.delete("/api/recipes/{recipe_id}")
 async def delete_recipe(
     recipe_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     recipe = db.query(SavedRecipe).filter(
@@ -311,11 +603,104 @@ async def delete_recipe(
         )
     
     db.delete(recipe)
+    bump_library_version(db, current_user.id)
     db.commit()
     
     return {"message": "Recipe deleted successfully"}
 
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    if not metrics.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Metrics are disabled"
+        )
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+# ==================== IMAGE PROXY ROUTES ====================
+
+@app.get("/api/images/{size}")
+async def get_image(size: str, url: str, sig: str):
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown image size"
+        )
+    
+    if not verify_signature(url, sig):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid image signature"
+        )
+    
+    try:
+        path = await get_image_proxy().get_thumbnail(url, size)
+    except ImageProxyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Could not load image: {str(e)}"
+        )
+    
+    # Signed URLs are content-addressed by origin URL and size, so cache hard
+    return FileResponse(
+        path,
+        media_type="image/webp",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+
+# ==================== ADMIN ROUTES ====================
+
+def require_admin(request: Request):
+    if not is_admin(request.headers.get("x-admin-token")):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not found"
+        )
+
+
+@app.get("/api/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    return profile_store.list()
+
+
+@app.get("/api/admin/prewarm", dependencies=[Depends(require_admin)])
+async def prewarm_stats():
+    prewarmer = get_prewarmer()
+    return {
+        "enabled": PREWARM_ENABLED and bool(PREWARM_FEEDS),
+        "feeds": prewarmer.feeds,
+        "last_cycle": prewarmer.stats.as_dict() if prewarmer.stats else None
+    }
+
+
+@app.get("/api/admin/profiles/{request_id}", dependencies=[Depends(require_admin)])
+async def get_profile(request_id: str):
+    profile = profile_store.get(request_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
+    if profile["format"] == "speedscope":
+        media_type, ext = "application/json", "speedscope.json"
+    else:
+        media_type, ext = "text/plain", "pstats.txt"
+    return Response(
+        content=profile["data"],
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{request_id}.{ext}"'}
+    )
+
+
+@app.get("/api/auth/cache-stats", dependencies=[Depends(require_admin)])
+async def auth_cache_stats():
+    return get_auth_cache_stats()
+
+
 # Health check
 @app.get("/api/health")
 async def health_check():
@@ -0,0 +1,126 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from config import METRICS_ENABLED
+
+try:
+    from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+except ImportError:
+    Counter = Histogram = None
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    generate_latest = None
+
+# Prometheus collection is only active when enabled and the client is installed
+enabled = METRICS_ENABLED and Histogram is not None
+
+if enabled:
+    STAGE_LATENCY = Histogram(
+        "recipe_stage_seconds",
+        "Latency of extraction pipeline stages",
+        ["stage"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+    )
+    BYTES_FETCHED = Counter("recipe_bytes_fetched_total", "Bytes fetched from upstreams", ["source"])
+    TOKENS_USED = Counter("recipe_llm_tokens_total", "LLM tokens used", ["kind"])
+    CACHE_REQUESTS = Counter("recipe_cache_requests_total", "Cache lookups", ["cache", "result"])
+    ERRORS = Counter("recipe_errors_total", "Errors by stage and type", ["stage", "type"])
+    STAGES_SKIPPED = Counter("recipe_stages_skipped_total", "Stages skipped to meet a deadline", ["stage"])
+
+# Set on exceptions that escape a stage(); survives threads and pickling to the parse pool
+FAILED_STAGE_ATTR = "_metrics_stage"
+
+# (stage, milliseconds) for the current request, rendered as Server-Timing
+_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("timings", default=None)
+# (stage, error type) captured in a parse pool worker, whose metrics live in another process
+_errors: ContextVar[Optional[List[Tuple[str, str]]]] = ContextVar("errors", default=None)
+
+
+def start_request_timing() -> List[Tuple[str, float]]:
+    timings: List[Tuple[str, float]] = []
+    _timings.set(timings)
+    return timings
+
+
+def capture_worker_metrics() -> Tuple[List[Tuple[str, float]], List[Tuple[str, str]]]:
+    """Collect stage timings and errors in a worker so the parent can record them."""
+    errors: List[Tuple[str, str]] = []
+    _errors.set(errors)
+    return start_request_timing(), errors
+
+
+def replay_worker_metrics(timings: List[Tuple[str, float]], errors: List[Tuple[str, str]]) -> None:
+    """Record a worker's captured timings and errors against the current request."""
+    request_timings = _timings.get()
+    for name, ms in timings:
+        if request_timings is not None:
+            request_timings.append((name, ms))
+        if enabled:
+            STAGE_LATENCY.labels(stage=name).observe(ms / 1000)
+    if enabled:
+        for stage_name, type_name in errors:
+            ERRORS.labels(stage=stage_name, type=type_name).inc()
+
+
+def server_timing_header(timings: List[Tuple[str, float]]) -> str:
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage for Server-Timing and the stage latency histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        # Tag the innermost failing stage so catch-alls further up record it there
+        if not hasattr(e, FAILED_STAGE_ATTR):
+            setattr(e, FAILED_STAGE_ATTR, name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((name, elapsed * 1000))
+        if enabled:
+            STAGE_LATENCY.labels(stage=name).observe(elapsed)
+
+
+def record_bytes(source: str, count: int) -> None:
+    if enabled and count:
+        BYTES_FETCHED.labels(source=source).inc(count)
+
+
+def record_tokens(prompt_tokens: int, completion_tokens: int) -> None:
+    if enabled:
+        TOKENS_USED.labels(kind="prompt").inc(prompt_tokens or 0)
+        TOKENS_USED.labels(kind="completion").inc(completion_tokens or 0)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    if enabled:
+        CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def failed_stage(error: BaseException, default: str) -> str:
+    """The stage that was active when error was raised, else default."""
+    return getattr(error, FAILED_STAGE_ATTR, default)
+
+
+def record_error(stage_name: str, error: BaseException) -> None:
+    """Count an error against the stage that raised it, falling back to stage_name."""
+    stage_name = failed_stage(error, stage_name)
+    errors = _errors.get()
+    if errors is not None:
+        errors.append((stage_name, type(error).__name__))
+    if enabled:
+        ERRORS.labels(stage=stage_name, type=type(error).__name__).inc()
+
+
+def record_skipped(stage_name: str) -> None:
+    if enabled:
+        STAGES_SKIPPED.labels(stage=stage_name).inc()
+
+
+def render_metrics() -> bytes:
+    return generate_latest() if enabled else b""
@@ -0,0 +1,86 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from config import BCRYPT_ROUNDS, HASH_POOL_SIZE, HASH_QUEUE_DEPTH
+
+# Kept free of web/database imports so pool workers start cheaply
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pending = 0
+
+
+class HashingQueueFull(Exception):
+    """Raised when too many hashing jobs are already waiting for the pool."""
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash if its cost factor is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Forking a running server with threads is unsafe; workers only import this module
+        _pool = ProcessPoolExecutor(
+            max_workers=HASH_POOL_SIZE,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    # Concurrent callers may have already replaced it
+    if _pool is broken:
+        _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_in_pool(func, *args):
+    global _pending
+    if _pending >= HASH_QUEUE_DEPTH:
+        raise HashingQueueFull("Password hashing queue is full")
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        pool = _get_pool()
+        try:
+            return await loop.run_in_executor(pool, func, *args)
+        except BrokenProcessPool as e:
+            # A worker died (OOM kill, segfault); start a fresh pool and retry once
+            print(f"Hashing pool crashed, restarting: {e}")
+            _reset_pool(pool)
+            return await loop.run_in_executor(_get_pool(), func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the hashing pool, off the event loop."""
+    return await _run_in_pool(get_password_hash, password)
+
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify (and rehash if needed) a password in the hashing pool."""
+    return await _run_in_pool(verify_and_update, plain_password, hashed_password)
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
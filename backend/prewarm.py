@@ -0,0 +1,464 @@
+"""Prewarm the shared extraction cache from recipe site sitemaps and RSS feeds.
+
+New and changed page URLs (by sitemap <lastmod> or feed dates) are
+extracted politely -- robots.txt, a minimum interval between requests to
+each host and an optional off-peak window -- and stored under the same
+extract:<key> entries that /api/extract serves from.
+
+Usage (from the backend folder):
+    python prewarm.py --feed https://www.example.com/sitemap.xml --once
+    python prewarm.py                # PREWARM_FEEDS, every PREWARM_INTERVAL inside PREWARM_WINDOW
+"""
+import re
+import json
+import time
+import zlib
+import asyncio
+import argparse
+import xml.etree.ElementTree as ET
+from datetime import datetime, time as dtime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import requests
+
+from config import (
+    CACHE_BACKEND_URL,
+    EXTRACT_CACHE_TTL,
+    PREWARM_FEEDS,
+    PREWARM_URL_PATTERN,
+    PREWARM_WINDOW,
+    PREWARM_INTERVAL,
+    PREWARM_HOST_INTERVAL,
+    PREWARM_CONCURRENCY,
+    PREWARM_MAX_URLS,
+    PREWARM_RESULT_TTL
+)
+from backends import get_backend
+from backends.base import Backend
+from schemas import RecipeResponse
+from metrics import record_error
+from extractors import canonicalize, extract_from_website_async, shutdown_parse_pool
+from extractors.website_extractor import HEADERS
+
+MAX_FEED_BYTES = 50 * 1024 * 1024
+MAX_SITEMAP_DEPTH = 2
+WARM_LOCK_TTL = 120  # same as get_or_compute's extraction lock
+# The cycle lock outlives the cycle's cut-off by this much, for extractions still in flight
+CYCLE_LOCK_MARGIN = 300
+
+
+class FeedEntry(NamedTuple):
+    url: str
+    lastmod: Optional[float]  # epoch seconds
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Parse W3C (sitemap/Atom) or RFC 822 (RSS) dates into epoch seconds."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _child(element, *names: str) -> Optional[str]:
+    for name in names:
+        for child in element:
+            if _local_name(child.tag) == name:
+                # Atom links carry the URL in href
+                value = (child.text or "").strip() or child.get("href")
+                if value:
+                    return value
+    return None
+
+
+def parse_feed(content: bytes) -> Tuple[List[FeedEntry], List[FeedEntry]]:
+    """Return (pages, child sitemaps) from a sitemap, sitemap index, RSS or Atom document."""
+    if content[:2] == b"\x1f\x8b":
+        content = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(content, MAX_FEED_BYTES)
+
+    pages, sitemaps = [], []
+    for element in ET.fromstring(content).iter():
+        kind = _local_name(element.tag)
+        if kind == "url":
+            url, date = _child(element, "loc"), _child(element, "lastmod")
+        elif kind == "sitemap":
+            url, date = _child(element, "loc"), _child(element, "lastmod")
+            if url:
+                sitemaps.append(FeedEntry(url, parse_timestamp(date)))
+            continue
+        elif kind in ("item", "entry"):
+            url = _child(element, "link")
+            date = _child(element, "updated", "pubdate", "date", "published")
+        else:
+            continue
+        if url:
+            pages.append(FeedEntry(url, parse_timestamp(date)))
+    return pages, sitemaps
+
+
+def parse_window(value: str) -> Optional[Tuple[dtime, dtime]]:
+    """Parse "HH:MM-HH:MM" into (start, end); windows may wrap past midnight."""
+    if not value:
+        return None
+    start, _, end = value.partition("-")
+    return dtime.fromisoformat(start.strip()), dtime.fromisoformat(end.strip())
+
+
+def in_window(window: Optional[Tuple[dtime, dtime]], now: Optional[datetime] = None) -> bool:
+    if window is None:
+        return True
+    current = (now or datetime.now()).time()
+    start, end = window
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def seconds_until_window(window: Optional[Tuple[dtime, dtime]], now: Optional[datetime] = None) -> float:
+    now = now or datetime.now()
+    if in_window(window, now):
+        return 0.0
+    start = now.replace(hour=window[0].hour, minute=window[0].minute, second=0, microsecond=0)
+    if start <= now:
+        start += timedelta(days=1)
+    return (start - now).total_seconds()
+
+
+class PrewarmStats:
+    """Counters for one crawl cycle."""
+
+    FIELDS = ("feeds", "feeds_failed", "discovered", "unchanged", "queued", "deferred",
+              "processed", "extracted", "failed", "disallowed")
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def as_dict(self) -> Dict:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            **{field: getattr(self, field) for field in self.FIELDS},
+            "running": self.finished_at is None,
+            "elapsed_s": round(elapsed, 1),
+            "per_minute": round(self.processed / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        }
+
+
+class Prewarmer:
+    """Discover recipe URLs from feeds and extract the new or changed ones ahead of demand."""
+
+    def __init__(self, feeds: List[str], backend: Optional[Backend] = None,
+                 host_interval: float = PREWARM_HOST_INTERVAL,
+                 concurrency: int = PREWARM_CONCURRENCY,
+                 max_urls: int = PREWARM_MAX_URLS,
+                 url_pattern: str = PREWARM_URL_PATTERN,
+                 window: Optional[Tuple[dtime, dtime]] = None,
+                 result_ttl: int = max(PREWARM_RESULT_TTL, EXTRACT_CACHE_TTL),
+                 progress_every: int = 0):
+        self.feeds = feeds
+        self.backend = backend or get_backend()
+        self.host_interval = host_interval
+        self.concurrency = max(1, concurrency)
+        self.max_urls = max_urls
+        self.url_pattern = re.compile(url_pattern) if url_pattern else None
+        self.window = window
+        self.result_ttl = result_ttl
+        self.progress_every = progress_every
+        self.stats: Optional[PrewarmStats] = None  # current or last cycle
+        self._robots: Dict[str, robotparser.RobotFileParser] = {}
+        self._next_request: Dict[str, float] = {}
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+
+    # -- politeness --
+
+    def _load_robots(self, origin: str) -> robotparser.RobotFileParser:
+        parser = robotparser.RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response = requests.get(parser.url, headers=HEADERS, timeout=10)
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.ok:
+                parser.parse(response.text.splitlines())
+            else:
+                parser.allow_all = True
+        except requests.RequestException:
+            parser.allow_all = True
+        return parser
+
+    async def _polite(self, url: str) -> bool:
+        """Wait for this host's next request slot; False if robots.txt disallows the URL."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        lock = self._host_locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            if origin not in self._robots:
+                self._robots[origin] = await asyncio.to_thread(self._load_robots, origin)
+            robots = self._robots[origin]
+            if not robots.can_fetch(HEADERS["User-Agent"], url):
+                return False
+
+            interval = max(self.host_interval, robots.crawl_delay(HEADERS["User-Agent"]) or 0)
+            delay = self._next_request.get(origin, 0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_request[origin] = time.monotonic() + interval
+            return True
+
+    # -- discovery --
+
+    def _fetch_feed(self, url: str) -> bytes:
+        with requests.get(url, headers=HEADERS, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            data = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                data += chunk
+                if len(data) > MAX_FEED_BYTES:
+                    raise ValueError("Feed is too large")
+        return bytes(data)
+
+    def _changed(self, seen: Optional[Dict], lastmod: Optional[float]) -> bool:
+        if seen is None:
+            return True
+        return lastmod is not None and (seen.get("lastmod") is None or lastmod > seen["lastmod"])
+
+    async def discover(self) -> Tuple[List[FeedEntry], List[Tuple[str, Optional[float]]]]:
+        """Collect page entries from all feeds, following sitemap indexes.
+
+        Also returns the child sitemaps read this cycle, which are marked as
+        seen once their pages have all been handled.
+        """
+        pages: Dict[str, FeedEntry] = {}
+        child_sitemaps = []
+        pending = [(feed, 0) for feed in self.feeds]
+
+        while pending:
+            feed_url, depth = pending.pop(0)
+            if not await self._polite(feed_url):
+                self.stats.disallowed += 1
+                continue
+            try:
+                content = await asyncio.to_thread(self._fetch_feed, feed_url)
+                entries, sitemaps = parse_feed(content)
+            except Exception as e:
+                print(f"Prewarm feed error ({feed_url}): {e}")
+                record_error("prewarm_feed", e)
+                self.stats.feeds_failed += 1
+                continue
+            self.stats.feeds += 1
+
+            for entry in entries:
+                if self.url_pattern and not self.url_pattern.search(entry.url):
+                    continue
+                known = pages.get(entry.url)
+                if known is None or (entry.lastmod or 0) > (known.lastmod or 0):
+                    pages[entry.url] = entry
+
+            if depth < MAX_SITEMAP_DEPTH:
+                for sitemap in sitemaps:
+                    # Child sitemaps whose index lastmod has not moved are not refetched
+                    seen = await self.backend.aget(f"prewarm:sitemap:{sitemap.url}") if sitemap.lastmod else None
+                    if self._changed(seen, sitemap.lastmod):
+                        pending.append((sitemap.url, depth + 1))
+                        child_sitemaps.append((sitemap.url, sitemap.lastmod))
+
+        self.stats.discovered = len(pages)
+        return list(pages.values()), child_sitemaps
+
+    async def select(self, entries: List[FeedEntry]) -> List[FeedEntry]:
+        """Keep new and changed website URLs, newest first, up to max_urls."""
+        selected = []
+        for entry in entries:
+            canonical = canonicalize(entry.url)
+            if canonical.platform:
+                continue
+            seen_key = f"prewarm:seen:{canonical.key}"
+            seen = await self.backend.aget(seen_key)
+            if not self._changed(seen, entry.lastmod):
+                self.stats.unchanged += 1
+            elif seen is None and await self.backend.aget(f"extract:{canonical.key}") is not None:
+                # Already warmed by user traffic; start tracking it from here
+                await self.backend.aset(seen_key, {"lastmod": entry.lastmod, "ok": True}, self.result_ttl)
+                self.stats.unchanged += 1
+            else:
+                selected.append(entry)
+
+        selected.sort(key=lambda e: e.lastmod or 0, reverse=True)
+        self.stats.deferred = max(0, len(selected) - self.max_urls)
+        selected = selected[:self.max_urls]
+        self.stats.queued = len(selected)
+        return selected
+
+    # -- extraction --
+
+    async def _warm(self, entry: FeedEntry) -> None:
+        canonical = canonicalize(entry.url)
+        cache_key = f"extract:{canonical.key}"
+
+        async def compute():
+            recipe = await extract_from_website_async(canonical.url)
+            if not recipe:
+                return None
+            return RecipeResponse.from_website(recipe, canonical.url).model_dump()
+
+        # Re-extract before touching the cache so a failing origin keeps the previous
+        # result; the lock keeps concurrent user requests from duplicating the work
+        lock_name = f"lock:{cache_key}"
+        token = await self.backend.aacquire_lock(lock_name, WARM_LOCK_TTL)
+        if token is None:
+            result = await self.backend.get_or_compute(cache_key, compute, ttl=self.result_ttl)
+        else:
+            try:
+                result = await compute()
+                if result is not None:
+                    await self.backend.aset(cache_key, result, self.result_ttl)
+            finally:
+                await self.backend.arelease_lock(lock_name, token)
+        if result is None:
+            self.stats.failed += 1
+        else:
+            self.stats.extracted += 1
+        await self.backend.aset(f"prewarm:seen:{canonical.key}",
+                                {"lastmod": entry.lastmod, "ok": result is not None}, self.result_ttl)
+
+    def _report_progress(self) -> None:
+        self.stats.processed += 1
+        done = self.stats.processed
+        if self.progress_every and (done % self.progress_every == 0 or done == self.stats.queued):
+            print(f"[prewarm] {done}/{self.stats.queued} extracted={self.stats.extracted} "
+                  f"failed={self.stats.failed} disallowed={self.stats.disallowed}")
+
+    async def _crawl_host(self, entries: List[FeedEntry], slots: asyncio.Semaphore,
+                          stop_at: Optional[float] = None) -> None:
+        async with slots:
+            for index, entry in enumerate(entries):
+                if not in_window(self.window) or (stop_at is not None and time.monotonic() >= stop_at):
+                    # Off-peak window closed or cycle out of time; leave the rest for the next one
+                    self.stats.deferred += len(entries) - index
+                    return
+                if not await self._polite(entry.url):
+                    # Remember it so it is not queued again until its lastmod changes
+                    self.stats.disallowed += 1
+                    await self.backend.aset(f"prewarm:seen:{canonicalize(entry.url).key}",
+                                            {"lastmod": entry.lastmod, "ok": False}, self.result_ttl)
+                    self._report_progress()
+                    continue
+                try:
+                    await self._warm(entry)
+                except Exception as e:
+                    print(f"Prewarm error ({entry.url}): {e}")
+                    record_error("prewarm", e)
+                    self.stats.failed += 1
+                self._report_progress()
+
+    async def run_once(self, max_duration: Optional[float] = None) -> Dict:
+        """Run one discover + extract cycle and return its stats.
+
+        With max_duration, no new extraction starts after that many seconds.
+        """
+        stop_at = time.monotonic() + max_duration if max_duration else None
+        self.stats = PrewarmStats()
+        entries, child_sitemaps = await self.discover()
+
+        by_host: Dict[str, List[FeedEntry]] = {}
+        for entry in await self.select(entries):
+            by_host.setdefault(urlsplit(entry.url).netloc, []).append(entry)
+
+        slots = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._crawl_host(host_entries, slots, stop_at) for host_entries in by_host.values()))
+
+        # Only skip a child sitemap next time if none of its pages were left over
+        if not self.stats.deferred:
+            for url, lastmod in child_sitemaps:
+                await self.backend.aset(f"prewarm:sitemap:{url}", {"lastmod": lastmod}, self.result_ttl)
+
+        self.stats.finished_at = time.time()
+        return self.stats.as_dict()
+
+    async def run_forever(self, interval: float = PREWARM_INTERVAL) -> None:
+        """Run a cycle every interval inside the window; one worker cluster-wide at a time."""
+        while True:
+            await asyncio.sleep(seconds_until_window(self.window))
+            # The cycle stops starting extractions after interval, so it cannot outlive the lock
+            token = await self.backend.aacquire_lock("lock:prewarm", interval + CYCLE_LOCK_MARGIN)
+            if token:
+                try:
+                    stats = await self.run_once(max_duration=interval)
+                    print(f"[prewarm] cycle finished: {json.dumps(stats)}")
+                except Exception as e:
+                    print(f"Prewarm cycle error: {e}")
+                    record_error("prewarm", e)
+                finally:
+                    await self.backend.arelease_lock("lock:prewarm", token)
+            await asyncio.sleep(interval)
+
+
+_prewarmer: Optional[Prewarmer] = None
+
+
+def get_prewarmer() -> Prewarmer:
+    global _prewarmer
+    if _prewarmer is None:
+        _prewarmer = Prewarmer(PREWARM_FEEDS, window=parse_window(PREWARM_WINDOW))
+    return _prewarmer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prewarm the extraction cache from sitemaps and RSS feeds")
+    parser.add_argument("--feed", action="append", help="sitemap, sitemap index or RSS/Atom URL (repeatable; default PREWARM_FEEDS)")
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    parser.add_argument("--ignore-schedule", action="store_true", help="ignore PREWARM_WINDOW")
+    parser.add_argument("--host-interval", type=float, default=PREWARM_HOST_INTERVAL)
+    parser.add_argument("--concurrency", type=int, default=PREWARM_CONCURRENCY)
+    parser.add_argument("--max-urls", type=int, default=PREWARM_MAX_URLS)
+    parser.add_argument("--match", default=PREWARM_URL_PATTERN, help="regex page URLs must match")
+    parser.add_argument("--progress", type=int, default=10, help="print progress every N URLs (0 disables)")
+    args = parser.parse_args()
+
+    feeds = args.feed or PREWARM_FEEDS
+    if not feeds:
+        parser.error("no feeds given (use --feed or set PREWARM_FEEDS)")
+
+    if CACHE_BACKEND_URL.startswith("memory://"):
+        print("Warning: CACHE_BACKEND_URL is memory://, results are lost when this process exits")
+
+    prewarmer = Prewarmer(
+        feeds,
+        host_interval=args.host_interval,
+        concurrency=args.concurrency,
+        max_urls=args.max_urls,
+        url_pattern=args.match,
+        window=None if args.ignore_schedule else parse_window(PREWARM_WINDOW),
+        progress_every=args.progress,
+    )
+    try:
+        if args.once:
+            print(json.dumps(asyncio.run(prewarmer.run_once()), indent=2))
+        else:
+            asyncio.run(prewarmer.run_forever())
+    except KeyboardInterrupt:
+        if prewarmer.stats:
+            print(json.dumps(prewarmer.stats.as_dict(), indent=2))
+    finally:
+        shutdown_parse_pool()
+
+
+if __name__ == "__main__":
+    main()
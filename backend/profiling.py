@@ -0,0 +1,137 @@
+import io
+import hmac
+import time
+import uuid
+import random
+import pstats
+import cProfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+from config import (
+    ADMIN_TOKEN,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SLOW_THRESHOLD_MS,
+    PROFILE_INTERVAL,
+    PROFILE_STORE_SIZE
+)
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    Profiler = None
+    SpeedscopeRenderer = None
+
+
+class _ProfileStore:
+    """Bounded, insertion-ordered store of recent captured profiles."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, request_id: str, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[request_id] = profile
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._data.get(request_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {k: v for k, v in p.items() if k != "data"}
+                for p in reversed(self._data.values())
+            ]
+
+
+profile_store = _ProfileStore(PROFILE_STORE_SIZE)
+
+
+def is_admin(token: Optional[str]) -> bool:
+    if not ADMIN_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+def new_request_id() -> str:
+    # Always server-generated: profiles are stored under it, so a client
+    # must not be able to pick (and overwrite) another request's entry
+    return uuid.uuid4().hex
+
+
+class RequestProfiler:
+    """Profiles one request with pyinstrument when installed, else cProfile.
+
+    cProfile is deterministic and profiles the whole event loop thread, so
+    concurrent requests show up in its output; pyinstrument is preferred.
+    """
+
+    def __init__(self):
+        if Profiler:
+            self._profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="enabled")
+            self.format = "speedscope"
+        else:
+            self._profiler = cProfile.Profile()
+            self.format = "pstats"
+
+    def start(self) -> None:
+        if Profiler:
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        if Profiler:
+            self._session = self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def render(self) -> str:
+        """Render a stopped profile; only done for profiles that are kept."""
+        if Profiler:
+            return SpeedscopeRenderer().render(self._session)
+
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(50)
+        return out.getvalue()
+
+
+def profile_reason(admin_header: Optional[str]) -> Optional[str]:
+    """Decide up front whether (and why) a request runs under the profiler."""
+    if is_admin(admin_header):
+        return "admin"
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    # Slow-request capture needs the profiler running from the start;
+    # only the sampling profiler is cheap enough to leave on for that
+    if PROFILE_SLOW_THRESHOLD_MS and Profiler is not None:
+        return "slow"
+    return None
+
+
+def keep_profile(reason: str, elapsed_ms: float) -> bool:
+    if reason != "slow":
+        return True
+    return elapsed_ms >= PROFILE_SLOW_THRESHOLD_MS
+
+
+def store_profile(request_id: str, method: str, path: str, elapsed_ms: float,
+                  reason: str, profiler: RequestProfiler,
+                  client_request_id: Optional[str] = None) -> None:
+    profile_store.add(request_id, {
+        "request_id": request_id,
+        "client_request_id": client_request_id,
+        "method": method,
+        "path": path,
+        "duration_ms": round(elapsed_ms, 1),
+        "reason": reason,
+        "format": profiler.format,
+        "captured_at": time.time(),
+        "data": profiler.render(),
+    })
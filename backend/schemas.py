@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
+from images import thumbnail_urls
 
 
 # Auth schemas
@@ -48,7 +49,28 @@ class RecipeResponse(BaseModel):
     source_type: str
     platform: Optional[str] = None
     tips: Optional[List[str]] = None
+    thumbnails: Optional[Dict[str, str]] = None
     error: Optional[str] = None
+    # Set when stages were skipped to meet the request deadline
+    degraded: bool = False
+    skipped_stages: Optional[List[str]] = None
+
+    @classmethod
+    def from_website(cls, recipe: Dict[str, Any], url: str) -> "RecipeResponse":
+        """Build the response (and cached shape) for a website extraction."""
+        return cls(
+            title=recipe.get("title", "Unknown Recipe"),
+            ingredients=recipe.get("ingredients", []),
+            instructions=recipe.get("instructions", []),
+            prep_time=recipe.get("prep_time"),
+            cook_time=recipe.get("cook_time"),
+            total_time=recipe.get("total_time"),
+            servings=recipe.get("servings"),
+            image_url=recipe.get("image_url"),
+            thumbnails=thumbnail_urls(recipe.get("image_url")),
+            source_url=url,
+            source_type="website"
+        )
 
 
 class SaveRecipeRequest(BaseModel):
@@ -72,7 +94,26 @@ class SavedRecipeResponse(BaseModel):
     prep_time: Optional[str]
     cook_time: Optional[str]
     servings: Optional[str]
+    thumbnails: Optional[Dict[str, str]] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class ShoppingListRequest(BaseModel):
+    recipe_ids: List[int]
+    scales: Optional[Dict[int, float]] = None  # recipe id -> multiplier
+    units: Literal["metric", "us"] = "metric"
+
+
+class ShoppingListItem(BaseModel):
+    item: str
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    recipes: int
+
+
+class ShoppingListResponse(BaseModel):
+    recipe_ids: List[int]
+    items: List[ShoppingListItem]
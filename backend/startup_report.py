@@ -0,0 +1,69 @@
+"""Report backend cold-start time, peak RSS and the slowest imports.
+
+Each scenario runs in a fresh interpreter so nothing is already imported.
+
+Usage (from the backend folder):
+    python startup_report.py [--top 15] [--runs 3]
+"""
+import sys
+import time
+import argparse
+import subprocess
+from typing import List, Tuple
+
+SCENARIOS = {
+    "baseline (config only)": "import config",
+    "import main": "import main",
+    "import main + warm_up": "import main; from extractors import warm_up; warm_up()",
+}
+
+
+def run_scenario(code: str) -> Tuple[float, float, str]:
+    """Return (wall seconds, peak RSS in MB, -X importtime output) for one run."""
+    # The child reports its own peak RSS (KB on Linux) as the last stdout line
+    code += "; import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    peak_kb = int(proc.stdout.strip().splitlines()[-1])
+    return elapsed, peak_kb / 1024, proc.stderr
+
+
+def slowest_imports(importtime_output: str, top: int) -> List[Tuple[int, str]]:
+    """Parse `-X importtime` lines and return the largest cumulative times (us)."""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = [p.strip() for p in line.split(":", 1)[1].split("|")]
+        rows.append((int(cumulative_us), name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend cold-start report")
+    parser.add_argument("--top", type=int, default=15, help="How many slow imports to list")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per scenario (best time is reported)")
+    args = parser.parse_args()
+
+    for label, code in SCENARIOS.items():
+        results = [run_scenario(code) for _ in range(args.runs)]
+        best = min(results, key=lambda r: r[0])
+        print(f"== {label}")
+        print(f"   startup: {best[0] * 1000:.0f} ms (best of {args.runs})")
+        print(f"   peak RSS: {max(r[1] for r in results):.1f} MB")
+        print("   slowest imports (cumulative):")
+        for cumulative_us, name in slowest_imports(best[2], args.top):
+            print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
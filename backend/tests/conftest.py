@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway database and caches before anything imports config
+_tmp = tempfile.mkdtemp(prefix="recipe-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'test.db')}")
+os.environ.setdefault("IMAGE_CACHE_DIR", os.path.join(_tmp, "images"))
+os.environ.setdefault("CACHE_BACKEND_URL", "memory://")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client, request):
+    name = request.node.name.replace("[", "-").replace("]", "")[:40]
+    response = client.post("/api/auth/register", json={
+        "email": f"{name}@example.com",
+        "username": name,
+        "password": "correct-horse"
+    })
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
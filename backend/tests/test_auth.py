@@ -0,0 +1,49 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+
+import auth
+import main
+import profiling
+
+
+def test_concurrent_registrations_for_same_email(client):
+    payload = {"email": "race@example.com", "username": "race", "password": "correct-horse"}
+
+    async def register_many():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*(ac.post("/api/auth/register", json=payload) for _ in range(3)))
+
+    responses = asyncio.run(register_many())
+
+    codes = sorted(r.status_code for r in responses)
+    assert codes == [200, 400, 400]
+    assert all(r.json()["detail"] == "Email already registered" for r in responses if r.status_code == 400)
+
+
+def test_auth_cache_stats_requires_admin_token(client, monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    assert client.get("/api/auth/cache-stats").status_code == 404
+    assert client.get("/api/auth/cache-stats", headers={"X-Admin-Token": "wrong"}).status_code == 404
+    assert client.get("/api/auth/cache-stats", headers={"X-Admin-Token": "secret"}).status_code == 200
+
+
+def test_invalidate_user_drops_every_token_for_that_user(client, auth_headers):
+    user_id = client.get("/api/auth/me", headers=auth_headers).json()["id"]
+    # A second, distinct token for the same user
+    second = {"Authorization": "Bearer " + auth.create_access_token({"sub": str(user_id)}, timedelta(minutes=5))}
+    client.get("/api/auth/me", headers=second)
+    assert auth.principal_cache.get(user_id) is not None
+
+    invalidations = auth.auth_stats["invalidations"]
+    auth.invalidate_user(user_id)
+
+    assert auth.principal_cache.get(user_id) is None
+    assert auth.auth_stats["invalidations"] == invalidations + 1
+    lookups = auth.auth_stats["db_lookups"]
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+    assert client.get("/api/auth/me", headers=second).status_code == 200
+    # Both tokens miss after invalidation; the first reload is shared by the second
+    assert auth.auth_stats["db_lookups"] == lookups + 1
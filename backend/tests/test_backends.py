@@ -0,0 +1,135 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from backends import Backend, MemoryBackend
+from backends.sqlite import SQLiteBackend
+from backends.redis_backend import RedisBackend
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryBackend()
+    elif request.param == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "cache.db"), poll=0.01)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")  # release_lock runs a Lua script
+        backend = RedisBackend(client=fakeredis.FakeRedis())
+    yield backend
+    backend.close()
+
+
+def test_get_set_with_ttl(backend):
+    backend.set("forever", {"v": 1})
+    backend.set("short", [1, 2], ttl=0.05)
+    assert backend.get("short") == [1, 2]
+    time.sleep(0.1)
+
+    assert backend.get("short") is None
+    assert backend.get("forever") == {"v": 1}
+    backend.delete("forever")
+    assert backend.get("forever") is None
+
+
+def test_lock_is_exclusive_until_released_or_expired(backend):
+    token = backend.acquire_lock("lock:a", 60)
+    assert token
+    assert backend.acquire_lock("lock:a", 60) is None
+
+    backend.release_lock("lock:a", "someone-else")
+    assert backend.acquire_lock("lock:a", 60) is None
+    backend.release_lock("lock:a", token)
+
+    assert backend.acquire_lock("lock:a", 0.05)
+    time.sleep(0.1)
+    assert backend.acquire_lock("lock:a", 60)
+
+
+def test_get_or_compute_runs_once_for_concurrent_callers(backend):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"title": "Soup"}
+
+    async def scenario():
+        return await asyncio.gather(*(backend.get_or_compute("extract:soup", compute, ttl=60, poll=0.01)
+                                      for _ in range(3)))
+
+    assert asyncio.run(scenario()) == [{"title": "Soup"}] * 3
+    assert len(calls) == 1
+    assert backend.get("extract:soup") == {"title": "Soup"}
+
+
+def test_job_queue_is_fifo(backend):
+    backend.enqueue("jobs", {"n": 1})
+    backend.enqueue("jobs", {"n": 2})
+    backend.enqueue("other", {"n": 3})
+
+    assert backend.queue_size("jobs") == 2
+    assert backend.dequeue("jobs") == {"n": 1}
+    assert backend.dequeue("jobs") == {"n": 2}
+    assert backend.dequeue("jobs") is None
+    assert backend.queue_size("other") == 1
+
+
+def test_adequeue_waits_without_blocking_the_event_loop(backend):
+    async def producer():
+        await asyncio.sleep(0.1)
+        await backend.aenqueue("jobs", {"n": 1})
+
+    async def scenario():
+        job, _ = await asyncio.gather(backend.adequeue("jobs", timeout=5), producer())
+        return job, await backend.adequeue("jobs", timeout=0.05)
+
+    assert asyncio.run(scenario()) == ({"n": 1}, None)
+
+
+def test_sqlite_purges_expired_rows_on_write(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), purge_interval=0)
+    backend.set("short", {"v": 1}, ttl=0.01)
+    assert backend.acquire_lock("lock:short", 0.01)
+    time.sleep(0.05)
+
+    backend.set("long", {"v": 2}, ttl=60)
+
+    conn = backend._conn()
+    assert [row[0] for row in conn.execute("SELECT key FROM cache")] == ["long"]
+    assert conn.execute("SELECT COUNT(*) FROM locks").fetchone()[0] == 0
+    backend.close()
+
+
+def test_get_or_compute_keeps_blocking_backends_off_the_event_loop(tmp_path):
+    callers = set()
+
+    class RecordingBackend(SQLiteBackend):
+        def get(self, key):
+            callers.add(threading.get_ident())
+            return super().get(key)
+
+    backend = RecordingBackend(str(tmp_path / "cache.db"))
+
+    async def compute():
+        return {"title": "Soup"}
+
+    async def scenario():
+        first = await backend.get_or_compute("extract:soup", compute, ttl=60)
+        second = await backend.get_or_compute("extract:soup", compute, ttl=60)
+        return first, second
+
+    assert asyncio.run(scenario()) == ({"title": "Soup"}, {"title": "Soup"})
+    assert callers and threading.get_ident() not in callers
+
+
+def test_backend_requires_the_primitives():
+    class Incomplete(Backend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
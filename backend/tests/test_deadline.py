@@ -0,0 +1,58 @@
+import time
+import asyncio
+
+from deadline import Deadline
+from backends.memory import MemoryBackend
+from extractors import ai_parser
+
+
+class APITimeoutError(Exception):
+    """Same name as the OpenAI client's timeout error."""
+
+
+class TimingOutClient:
+    class chat:
+        class completions:
+            @staticmethod
+            def create(**kwargs):
+                raise APITimeoutError("Request timed out.")
+
+
+def test_llm_timeout_marks_the_result_degraded(monkeypatch):
+    monkeypatch.setattr(ai_parser, "get_openai_client", lambda: TimingOutClient)
+    deadline = Deadline(30)
+
+    result = ai_parser.parse_recipe_with_ai("Whisk two eggs with milk and flour. " * 5, "Pancakes", "youtube", deadline)
+
+    assert "error" in result
+    assert deadline.skipped == ["llm"]
+
+
+def test_other_llm_errors_are_not_skips(monkeypatch):
+    class BrokenClient:
+        class chat:
+            class completions:
+                @staticmethod
+                def create(**kwargs):
+                    raise ValueError("bad request")
+
+    monkeypatch.setattr(ai_parser, "get_openai_client", lambda: BrokenClient)
+    deadline = Deadline(30)
+
+    ai_parser.parse_recipe_with_ai("Whisk two eggs with milk and flour. " * 5, "Pancakes", "youtube", deadline)
+
+    assert deadline.skipped == []
+
+
+def test_waiters_give_up_at_their_deadline():
+    backend = MemoryBackend()
+    assert backend.acquire_lock("lock:extract:slow", 120)
+
+    async def compute():
+        return None  # out of time: the degraded result is not cached
+
+    start = time.monotonic()
+    result = asyncio.run(backend.get_or_compute("extract:slow", compute, poll=0.05, max_wait=0.3))
+
+    assert result is None
+    assert time.monotonic() - start < 2
@@ -0,0 +1,41 @@
+from database import SessionLocal, LibraryVersion
+from library import bump_library_version, get_library_version
+
+RECIPE = {
+    "title": "Toast",
+    "source_url": "https://example.com/toast",
+    "ingredients": ["1 slice bread"],
+    "instructions": ["Toast it"]
+}
+
+
+def test_recipe_etag_is_weak_and_revalidates(client, auth_headers):
+    recipe_id = client.post("/api/recipes/save", json=RECIPE, headers=auth_headers).json()["id"]
+
+    response = client.get(f"/api/recipes/{recipe_id}", headers=auth_headers)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    for candidate in (etag, etag[2:], "*"):
+        revalidated = client.get(f"/api/recipes/{recipe_id}", headers={**auth_headers, "If-None-Match": candidate})
+        assert revalidated.status_code == 304
+
+
+def test_wildcard_does_not_hide_missing_recipes(client, auth_headers):
+    response = client.get("/api/recipes/999999", headers={**auth_headers, "If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_bump_library_version_upserts(client, auth_headers):
+    user_id = client.get("/api/auth/me", headers=auth_headers).json()["id"]
+    db = SessionLocal()
+    try:
+        db.query(LibraryVersion).filter(LibraryVersion.user_id == user_id).delete()
+        db.commit()
+
+        bump_library_version(db, user_id)
+        bump_library_version(db, user_id)
+        db.commit()
+        assert get_library_version(db, user_id) == 2
+    finally:
+        db.close()
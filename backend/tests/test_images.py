@@ -0,0 +1,102 @@
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import images
+
+PNG = (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4"
+       b"\x89\x00\x00\x00\rIDATx\x9cc\xf8\xff\xff?\x00\x05\xfe\x02\xfe\xa7V\xbd\xfa\x00\x00\x00\x00IEND\xaeB`\x82")
+
+
+@pytest.fixture
+def origin():
+    seen_hosts = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            seen_hosts.append(self.headers["Host"])
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(PNG)))
+            self.end_headers()
+            self.wfile.write(PNG)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1], seen_hosts
+    server.shutdown()
+
+
+def test_pinned_request_connects_to_vetted_address_without_resolving_again(origin):
+    port, seen_hosts = origin
+    # The hostname does not resolve; only the pinned address can reach the origin
+    url = f"http://images.rebind.invalid:{port}/photo.png"
+
+    with requests.Session() as session:
+        response = images._pinned_request(session, url, "127.0.0.1", {})
+        assert images._read_image(response) == PNG
+
+    assert seen_hosts == [f"images.rebind.invalid:{port}"]
+
+
+def test_fetch_origin_rejects_hosts_resolving_to_private_addresses(monkeypatch):
+    monkeypatch.setattr(images, "IMAGE_PROXY_ALLOW_PRIVATE", False)
+    monkeypatch.setattr(images.socket, "getaddrinfo", lambda *a, **k: [(None, None, None, "", ("10.0.0.5", 80))])
+
+    with pytest.raises(images.ImageProxyError):
+        images.fetch_origin("http://internal.example/photo.png")
+
+
+def test_unreachable_origin_is_a_bad_gateway(client, monkeypatch):
+    monkeypatch.setattr(images, "IMAGE_PROXY_ALLOW_PRIVATE", True)
+    # Nothing listens on port 9 locally, so the connection is refused
+    url = "http://127.0.0.1:9/photo.png"
+
+    response = client.get("/api/images/small", params={"url": url, "sig": images.sign_url(url)})
+
+    assert response.status_code == 502
+
+
+def _jpeg(width, height, orientation=None):
+    from PIL import Image
+
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), "orange").save(out, "JPEG", exif=exif.tobytes())
+    return out.getvalue()
+
+
+def _size(webp):
+    from PIL import Image
+
+    return Image.open(io.BytesIO(webp)).size
+
+
+def test_thumbnails_follow_exif_orientation():
+    thumbnails = images.make_thumbnails(_jpeg(2000, 1000, orientation=6))
+
+    assert _size(thumbnails["large"]) == (1000, 2000)
+    assert _size(thumbnails["medium"]) == (800, 1600)
+    assert _size(thumbnails["small"]) == (400, 800)
+
+
+def test_large_jpegs_are_resized_from_a_reduced_decode():
+    thumbnails = images.make_thumbnails(_jpeg(4800, 3200))
+
+    assert _size(thumbnails["large"]) == (1200, 800)
+    assert _size(thumbnails["small"]) == (400, 267)
+
+
+def test_images_over_the_pixel_limit_are_rejected(monkeypatch):
+    monkeypatch.setattr(images, "IMAGE_MAX_PIXELS", 1000)
+
+    with pytest.raises(images.ImageProxyError, match="too large"):
+        images.make_thumbnails(_jpeg(100, 100))
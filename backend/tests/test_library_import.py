@@ -0,0 +1,77 @@
+import gzip
+import json
+import asyncio
+
+import pytest
+
+import main
+import library
+
+
+def recipe_line(index):
+    return json.dumps({
+        "title": f"Imported {index}",
+        "source_url": f"https://example.com/recipes/{index}",
+        "ingredients": ["1 cup flour"],
+        "instructions": ["Mix"]
+    }).encode("utf-8")
+
+
+def test_interrupted_import_reports_committed_counts(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(library, "LIBRARY_BATCH_SIZE", 2)
+
+    async def broken_upload(chunks, gzipped=False):
+        for index in range(5):
+            yield recipe_line(index)
+        yield b"not json"
+        raise OSError("upload stream broke")
+
+    monkeypatch.setattr(main, "iter_upload_lines", broken_upload)
+
+    response = client.post("/api/recipes/import", content=b"", headers=auth_headers)
+
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    # Two full batches were committed; the fifth recipe was in the rolled-back batch
+    assert detail == {
+        "error": "Failed to import recipes: upload stream broke",
+        "imported": 4,
+        "failed": 1
+    }
+    assert len(client.get("/api/recipes", headers=auth_headers).json()) == 4
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _lines(chunks, gzipped=False):
+    async def collect():
+        return [line async for line in library.iter_upload_lines(chunks, gzipped)]
+    return asyncio.run(collect())
+
+
+def test_over_long_lines_are_cut_once(monkeypatch):
+    monkeypatch.setattr(library, "LIBRARY_MAX_LINE_BYTES", 8)
+
+    lines = _lines(_chunks(b"short\nabcdefgh", b"ijklmnop", b"qrstu\nok\n", b"tail"))
+
+    assert lines == [b"short", b"abcdefghi", b"ok", b"tail"]
+
+
+def test_decompressed_upload_size_is_capped(monkeypatch):
+    monkeypatch.setattr(library, "LIBRARY_MAX_UPLOAD_BYTES", 1024 * 1024)
+    bomb = gzip.compress(b"\n" * (8 * 1024 * 1024))
+
+    with pytest.raises(ValueError, match="too large"):
+        _lines(_chunks(bomb), gzipped=True)
+
+
+def test_over_long_lines_count_as_failed(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(library, "LIBRARY_MAX_LINE_BYTES", 300)
+    body = recipe_line(1) + b"\n" + b"x" * 1000 + b"\n" + recipe_line(2) + b"\n"
+
+    response = client.post("/api/recipes/import", content=body, headers=auth_headers)
+
+    assert response.json() == {"imported": 2, "failed": 1}
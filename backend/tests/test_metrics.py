@@ -0,0 +1,34 @@
+import pickle
+
+import pytest
+
+from metrics import capture_worker_metrics, record_error, stage
+
+
+def _fail_in(*stages):
+    def run(names):
+        if not names:
+            raise ValueError("boom")
+        with stage(names[0]):
+            run(names[1:])
+
+    with pytest.raises(ValueError) as info:
+        run(list(stages))
+    return info.value
+
+
+def test_record_error_uses_the_stage_that_raised():
+    _, errors = capture_worker_metrics()
+
+    record_error("fetch", _fail_in("parse", "jsonld"))
+    record_error("fetch", ValueError("outside any stage"))
+
+    assert errors == [("jsonld", "ValueError"), ("fetch", "ValueError")]
+
+
+def test_failed_stage_survives_the_trip_back_from_the_parse_pool():
+    _, errors = capture_worker_metrics()
+
+    record_error("extract", pickle.loads(pickle.dumps(_fail_in("scrape"))))
+
+    assert errors == [("scrape", "ValueError")]
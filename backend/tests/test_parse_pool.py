@@ -0,0 +1,57 @@
+import time
+import asyncio
+
+from metrics import start_request_timing
+from extractors import parse_pool
+
+
+def slow_or_fast_parse(content, encoding, url):
+    if content == b"stuck":
+        time.sleep(60)
+    return {"title": content.decode()}, [], []
+
+
+def test_timed_out_parse_does_not_block_later_pages(monkeypatch):
+    monkeypatch.setattr(parse_pool, "PARSE_POOL_SIZE", 1)
+    monkeypatch.setattr(parse_pool, "PARSE_TIMEOUT", 5)
+    monkeypatch.setattr(parse_pool, "_parse_in_worker", slow_or_fast_parse)
+
+    async def scenario():
+        # Warm the single worker so the timeout measures parsing, not process start-up
+        await parse_pool.parse_html_async(b"warm", None, "https://example.com/warm")
+        parse_pool.PARSE_TIMEOUT = 1
+        stuck = await parse_pool.parse_html_async(b"stuck", None, "https://example.com/stuck")
+        parse_pool.PARSE_TIMEOUT = 5
+        fine = await parse_pool.parse_html_async(b"fine", None, "https://example.com/fine")
+        return stuck, fine
+
+    try:
+        stuck, fine = asyncio.run(scenario())
+    finally:
+        parse_pool.shutdown_parse_pool()
+
+    assert stuck is None
+    assert fine == {"title": "fine"}
+
+
+JSON_LD_PAGE = b"""<html><script type="application/ld+json">
+{"@type": "Recipe", "name": "Tomato Soup", "recipeIngredient": ["4 tomatoes"]}
+</script></html>"""
+
+
+def test_worker_stages_and_errors_reach_the_request():
+    async def scenario():
+        timings = start_request_timing()
+        recipe = await parse_pool.parse_html_async(JSON_LD_PAGE, "utf-8", "https://unsupported.example/soup")
+        return recipe, [name for name, _ in timings]
+
+    try:
+        recipe, stages = asyncio.run(scenario())
+    finally:
+        parse_pool.shutdown_parse_pool()
+
+    assert recipe["title"] == "Tomato Soup"
+    assert stages == ["scrape", "jsonld", "parse"]
+
+    _, _, errors = parse_pool._parse_in_worker(JSON_LD_PAGE, "utf-8", "https://unsupported.example/soup")
+    assert [stage_name for stage_name, _ in errors] == ["scrape"]
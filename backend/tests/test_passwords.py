@@ -0,0 +1,21 @@
+import os
+import signal
+import asyncio
+
+import passwords
+
+
+def test_hashing_pool_recovers_from_killed_workers():
+    async def scenario():
+        hashed = await passwords.hash_password_async("secret")
+        for pid in list(passwords._pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        await asyncio.sleep(0.2)
+        return [await passwords.verify_and_update_async("secret", hashed) for _ in range(3)]
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        passwords.shutdown_pool()
+
+    assert all(valid for valid, _ in results)
@@ -0,0 +1,58 @@
+import asyncio
+
+import prewarm
+from backends.memory import MemoryBackend
+from extractors import canonicalize
+
+URL = "https://bench.example/recipes/1"
+CACHE_KEY = f"extract:{canonicalize(URL).key}"
+
+
+def warm(monkeypatch, backend, recipe):
+    async def fake_extract(url):
+        return recipe
+
+    monkeypatch.setattr(prewarm, "extract_from_website_async", fake_extract)
+    prewarmer = prewarm.Prewarmer([], backend=backend)
+    prewarmer.stats = prewarm.PrewarmStats()
+    asyncio.run(prewarmer._warm(prewarm.FeedEntry(URL, 1704067200.0)))
+    return prewarmer.stats
+
+
+def test_failed_rewarm_keeps_the_cached_result(monkeypatch):
+    backend = MemoryBackend()
+    backend.set(CACHE_KEY, {"title": "Old Soup"})
+
+    stats = warm(monkeypatch, backend, None)
+
+    assert stats.failed == 1
+    assert backend.get(CACHE_KEY) == {"title": "Old Soup"}
+
+
+def test_rewarm_replaces_the_cached_result(monkeypatch):
+    backend = MemoryBackend()
+    backend.set(CACHE_KEY, {"title": "Old Soup"})
+
+    stats = warm(monkeypatch, backend, {"title": "New Soup", "ingredients": ["water"]})
+
+    assert stats.extracted == 1
+    assert backend.get(CACHE_KEY) == prewarm.RecipeResponse.from_website(
+        {"title": "New Soup", "ingredients": ["water"]}, canonicalize(URL).url
+    ).model_dump()
+
+
+def test_cycle_defers_urls_past_its_cut_off(monkeypatch):
+    warmed = []
+
+    async def fake_warm(self, entry):
+        warmed.append(entry.url)
+
+    monkeypatch.setattr(prewarm.Prewarmer, "_warm", fake_warm)
+    prewarmer = prewarm.Prewarmer([], backend=MemoryBackend(), host_interval=0)
+    prewarmer.stats = prewarm.PrewarmStats()
+    entries = [prewarm.FeedEntry(f"https://bench.example/recipes/{i}", None) for i in range(3)]
+
+    asyncio.run(prewarmer._crawl_host(entries, asyncio.Semaphore(1), stop_at=prewarm.time.monotonic() - 1))
+
+    assert warmed == []
+    assert prewarmer.stats.deferred == 3
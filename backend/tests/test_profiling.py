@@ -0,0 +1,37 @@
+import main
+import profiling
+
+
+def test_profiles_are_stored_under_a_server_generated_id(client, monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+
+    response = client.get("/api/health", headers={"X-Profile": "secret", "X-Request-ID": "chosen-by-client"})
+
+    request_id = response.headers["X-Request-ID"]
+    assert request_id != "chosen-by-client"
+    assert profiling.profile_store.get("chosen-by-client") is None
+    profile = profiling.profile_store.get(request_id)
+    assert profile["client_request_id"] == "chosen-by-client"
+    assert profile["data"]
+
+
+def test_discarded_profiles_are_not_rendered(client, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(main, "keep_profile", lambda reason, elapsed_ms: False)
+    monkeypatch.setattr(profiling.RequestProfiler, "render", lambda self: rendered.append(self) or "")
+
+    response = client.get("/api/health", headers={"X-Profile": "secret"})
+
+    assert response.status_code == 200
+    assert rendered == []
+
+
+def test_is_admin(monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "")
+    assert not profiling.is_admin("")
+
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    assert profiling.is_admin("secret")
+    assert not profiling.is_admin("secreT")
+    assert not profiling.is_admin(None)
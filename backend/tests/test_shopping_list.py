@@ -0,0 +1,74 @@
+def _save(client, headers, title, ingredients):
+    response = client.post("/api/recipes/save", headers=headers, json={
+        "title": title,
+        "source_url": f"https://example.com/{title}",
+        "ingredients": ingredients,
+        "instructions": ["Mix."]
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _items(client, headers, recipe_ids, **extra):
+    response = client.post("/api/recipes/shopping-list", headers=headers,
+                           json={"recipe_ids": recipe_ids, **extra})
+    assert response.status_code == 200, response.text
+    return {item["item"]: item for item in response.json()["items"]}
+
+
+def test_aggregates_across_recipes_with_unit_conversion(client, auth_headers):
+    first = _save(client, auth_headers, "cake", ["1 cup milk", "2 large eggs"])
+    second = _save(client, auth_headers, "pancakes", ["4 tbsp milk", "1 egg, beaten"])
+
+    items = _items(client, auth_headers, [first, second], units="us")
+
+    assert items["milk"]["unit"] == "cup"
+    assert items["milk"]["quantity"] == 1.25
+    assert items["egg"]["quantity"] == 3
+    assert items["egg"]["recipes"] == 2
+
+
+def test_deleted_recipe_ingredients_do_not_leak_into_reused_id(client, auth_headers):
+    old_id = _save(client, auth_headers, "bread", ["1 cup flour"])
+    assert client.delete(f"/api/recipes/{old_id}", headers=auth_headers).status_code == 200
+
+    new_id = _save(client, auth_headers, "omelette", ["2 eggs"])
+    items = _items(client, auth_headers, [new_id])
+
+    assert set(items) == {"egg"}
+
+
+def test_rejects_recipes_of_other_users(client, auth_headers):
+    response = client.post("/api/recipes/shopping-list", headers=auth_headers,
+                           json={"recipe_ids": [999999]})
+    assert response.status_code == 404
+
+
+def test_scales_apply_per_recipe_in_metric_units(client, auth_headers):
+    soup = _save(client, auth_headers, "soup", ["500 ml stock", "200 g lentils"])
+    bread = _save(client, auth_headers, "flatbread", ["300 g lentils"])
+
+    items = _items(client, auth_headers, [soup, bread], scales={str(soup): 2.5})
+
+    assert (items["stock"]["quantity"], items["stock"]["unit"]) == (1.25, "l")
+    assert (items["lentil"]["quantity"], items["lentil"]["unit"]) == (800, "g")
+    assert items["lentil"]["recipes"] == 2
+
+
+def test_recipes_without_ingredients_are_indexed_once(client, auth_headers):
+    from database import SessionLocal, RecipeIngredient
+
+    recipe_id = _save(client, auth_headers, "water", [])
+    db = SessionLocal()
+    try:
+        # As if saved before the ingredient index existed
+        db.query(RecipeIngredient).filter(RecipeIngredient.recipe_id == recipe_id).delete()
+        db.commit()
+
+        for _ in range(2):
+            assert _items(client, auth_headers, [recipe_id]) == {}
+
+        rows = db.query(RecipeIngredient).filter(RecipeIngredient.recipe_id == recipe_id).all()
+        assert [row.position for row in rows] == [-1]
+    finally:
+        db.close()
@@ -0,0 +1,20 @@
+from extractors import canonicalize, is_video_url
+from extractors.video_extractor import extract_youtube_id
+
+
+def test_tracking_params_and_hosts_share_a_key():
+    a = canonicalize("https://www.example.com/recipes/soup/?utm_source=x&fbclid=y")
+    b = canonicalize("example.com/recipes/soup")
+    assert a.key == b.key == "example.com/recipes/soup"
+
+
+def test_malformed_input_is_kept_as_is():
+    text = "see http://example.com/recipe"
+    assert canonicalize(text) == (text, text, None, None)
+    assert is_video_url(text) is False
+    assert extract_youtube_id(text) is None
+
+
+def test_extract_rejects_malformed_url_with_400(client):
+    response = client.post("/api/extract", json={"url": "see http://example.com/recipe"})
+    assert response.status_code == 400
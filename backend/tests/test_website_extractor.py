@@ -0,0 +1,32 @@
+import requests
+
+from extractors import website_extractor
+from extractors.website_extractor import decode_html, fetch_html
+
+PAGE = "<html><body><h1>Crème brûlée</h1><p>Vanilla, cream and a crisp caramel top.</p></body></html>"
+
+
+def _response(content: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.headers["Content-Type"] = content_type
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def test_fetch_html_only_reports_a_declared_charset(monkeypatch):
+    responses = iter([
+        _response(PAGE.encode("utf-8"), "text/html"),
+        _response(PAGE.encode("cp1252"), "text/html; charset=windows-1252"),
+    ])
+    monkeypatch.setattr(website_extractor.requests, "get", lambda *args, **kwargs: next(responses))
+
+    assert fetch_html("https://example.com/a") == (PAGE.encode("utf-8"), None)
+    assert fetch_html("https://example.com/b") == (PAGE.encode("cp1252"), "windows-1252")
+
+
+def test_decode_html_detects_undeclared_charsets():
+    # Without detection this would be read as ISO-8859-1 and mangle every accent
+    assert decode_html(PAGE.encode("utf-8"), None) == PAGE
+    assert decode_html(PAGE.encode("cp1252"), "windows-1252") == PAGE
@@ -7,7 +7,7 @@ export default function RecipeCard({ recipe, onDelete, showDelete = false }) {
     <div className="recipe-card bg-white rounded-2xl overflow-hidden shadow-md border border-sage-100">
       <div className="relative h-48 overflow-hidden">
         <img 
-          src={recipe.image_url || defaultImage}
+          src={recipe.thumbnails?.small || recipe.image_url || defaultImage}
           alt={recipe.title}
           className="w-full h-full object-cover"
           onError={(e) => { e.target.src = defaultImage }}
@@ -38,7 +38,7 @@ export default function RecipeDisplay({ recipe }) {
       {/* Hero Section */}
       <div className="relative h-64 md:h-80 rounded-2xl overflow-hidden mb-8">
         <img 
-          src={recipe.image_url || defaultImage}
+          src={recipe.thumbnails?.large || recipe.image_url || defaultImage}
           alt={recipe.title}
           className="w-full h-full object-cover"
           onError={(e) => { e.target.src = defaultImage }}